@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+# Render build command (service root: backend/): install the dependencies and bundle the NLTK
+# punkt sentence model into nltk_data/, where summarizer.py reads it (it never downloads at runtime).
+set -o errexit
+
+pip install -r requirements.txt
+python -m nltk.downloader -d nltk_data punkt_tab punkt
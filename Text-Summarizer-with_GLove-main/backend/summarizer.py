@@ -9,7 +9,7 @@ Robust extractive summarizer:
 Features:
 - optional GloVe (place glove.6B.100d.txt in backend/)
 - TF-IDF fallback if GloVe missing
-- Safe NLTK usage (tries to use nltk.sent_tokenize & stopwords; falls back to simple split)
+- Safe NLTK usage (punkt & stopwords read offline from NLTK_DATA_DIR; falls back to simple split)
 - Good error handling
 """
 
@@ -20,38 +20,19 @@ import logging
 import numpy as np
 import pandas as pd
 
-import nltk
-
-# =======================
-# NLTK PRODUCTION FIX
-# =======================
-
-# Writable directory for Render
-NLTK_DATA_DIR = "/opt/render/nltk_data"
-os.makedirs(NLTK_DATA_DIR, exist_ok=True)
-
-# Tell nltk where to look
-nltk.data.path.append(NLTK_DATA_DIR)
-
-# Download punkt if missing
-try:
-    nltk.data.find("tokenizers/punkt")
-except LookupError:
-    nltk.download("punkt", download_dir=NLTK_DATA_DIR)
-
-# Download stopwords if missing
-try:
-    nltk.data.find("corpora/stopwords")
-except LookupError:
-    nltk.download("stopwords", download_dir=NLTK_DATA_DIR)
-
-
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import networkx as nx
 
 _LOG = logging.getLogger(__name__)
 
+# NLTK data (punkt sentence model, stopword list) is read from NLTK_DATA_DIR and never
+# downloaded at runtime. The English stopword list ships in backend/nltk_data; the punkt model
+# is added by the build step (build.sh: python -m nltk.downloader -d nltk_data punkt_tab punkt).
+# /opt/render/nltk_data, where earlier deployments downloaded the data, is still read after it.
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA_DIR", os.path.join(os.path.dirname(__file__), "nltk_data"))
+_NLTK_DATA_DIRS = [NLTK_DATA_DIR, "/opt/render/nltk_data"]
+
 # Paths to look for glove file (you can place glove.6B.100d.txt inside backend/).
 _GLOVE_PATHS = [
     os.path.join(os.path.dirname(__file__), "glove.6B.100d.txt"),
@@ -97,6 +78,42 @@ def _load_glove() -> Optional[dict]:
 
 
 # --- Tokenization & stopwords (use nltk if available, but safe fallback) ---
+def _read_stopwords(data_dir: str) -> Optional[set]:
+    """English stopwords from an nltk_data directory (corpora/stopwords/english), or None."""
+    path = os.path.join(data_dir, "corpora", "stopwords", "english")
+    try:
+        with open(path, encoding="utf-8") as fh:
+            words = {line.strip() for line in fh if line.strip()}
+    except OSError:
+        return None
+    return words or None
+
+
+def _punkt_sent_tokenize(data_dir: str):
+    """nltk punkt tokenize function loaded from the files in data_dir, or None when they are not there.
+    Files are opened by path (data_dir is registered on nltk.data.path, which nltk requires for
+    reading); there is no search of other nltk_data locations and no download."""
+    tab_dir = os.path.join(data_dir, "tokenizers", "punkt_tab", "english")
+    pickled = os.path.join(data_dir, "tokenizers", "punkt", "english.pickle")
+    if not (os.path.isdir(tab_dir) or os.path.isfile(pickled)):
+        return None
+    try:
+        import nltk
+
+        if data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, data_dir)
+        if os.path.isdir(tab_dir):
+            # nltk >= 3.8.2: plain-text parameter files
+            from nltk.tokenize.punkt import PunktSentenceTokenizer, load_punkt_params
+
+            params = load_punkt_params(nltk.data.FileSystemPathPointer(tab_dir))
+            return PunktSentenceTokenizer(params).tokenize
+        return nltk.data.load("file:" + pickled).tokenize
+    except Exception as e:
+        _LOG.warning("Could not load punkt from %s: %s", data_dir, e)
+    return None
+
+
 def _get_sentence_tokenizer_and_stopset():
     fallback_stop = set(
         """a an the and or if in on at for to of is are was were be been it this that
@@ -104,39 +121,25 @@ def _get_sentence_tokenizer_and_stopset():
         my your so what which who whom""".split()
     )
 
-    try:
-        import nltk
-        from nltk.tokenize import sent_tokenize
-
-        # ensure punkt & stopwords exist - download only if missing
-        try:
-            nltk.data.find("tokenizers/punkt")
-        except LookupError:
-            _LOG.info("Downloading NLTK punkt tokenizer (one-time) ...")
-            nltk.download("punkt")
-        # stopwords
-        try:
-            nltk.data.find("corpora/stopwords")
-            from nltk.corpus import stopwords
+    stopset = next((s for s in map(_read_stopwords, _NLTK_DATA_DIRS) if s is not None), None)
+    if stopset is None:
+        _LOG.warning("No stopword list in %s; using the built-in short list", _NLTK_DATA_DIRS)
+        stopset = fallback_stop
 
-            stopset = set(stopwords.words("english"))
-        except LookupError:
-            _LOG.info("Downloading NLTK stopwords (one-time) ...")
-            nltk.download("stopwords")
-            from nltk.corpus import stopwords
+    for data_dir in _NLTK_DATA_DIRS:
+        sent_tokenize = _punkt_sent_tokenize(data_dir)
+        if sent_tokenize is not None:
+            return sent_tokenize, stopset
 
-            stopset = set(stopwords.words("english"))
-        except Exception:
-            stopset = fallback_stop
+    _LOG.warning("No punkt model in %s (run build.sh); using the simple regex sentence splitter",
+                 _NLTK_DATA_DIRS)
 
-        return sent_tokenize, stopset
-    except Exception:
-        # fallback simple sentence splitter
-        def _simple_sent_tokenize(text: str) -> List[str]:
-            pieces = re.split(r"(?<=[.!?])\s+", text.strip())
-            return [p.strip() for p in pieces if p.strip()]
+    # fallback simple sentence splitter
+    def _simple_sent_tokenize(text: str) -> List[str]:
+        pieces = re.split(r"(?<=[.!?])\s+", text.strip())
+        return [p.strip() for p in pieces if p.strip()]
 
-        return _simple_sent_tokenize, fallback_stop
+    return _simple_sent_tokenize, stopset
 
 
 _sent_tokenize, _stopwords = _get_sentence_tokenizer_and_stopset()
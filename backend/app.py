@@ -4,8 +4,9 @@ backend/app.py
 Flask API server for summarizer. Endpoints:
 
 - GET  /api/ping
-- POST /api/summarize           # JSON { "text": "...", "sentences": 3 }
-- GET  /api/summarize-dataset   # query ?n=3 (summarizes backend/TASK.xlsx or latest upload)
+- GET  /api/ready               # GloVe warm-up state; TF-IDF serves requests until it is ready
+- POST /api/summarize           # JSON { "text": "...", "sentences": 3 } (optional "max_chars" / "max_tokens")
+- GET  /api/summarize-dataset   # query ?n=3 or ?max_chars=... / ?max_tokens=... (summarizes backend/TASK.xlsx or latest upload)
 - POST /api/upload-dataset      # multipart form; field 'file' (.xlsx/.xls/.csv/.txt)
 - Serves frontend build from backend/frontend/build if present
 """
@@ -14,12 +15,13 @@ import os
 import logging
 import traceback
 from datetime import datetime
+from typing import Optional
 from flask import Flask, request, jsonify, send_from_directory, abort
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
 
 # import summarizer functions
-from summarizer import summary_text, summarize_dataset
+from summarizer import summary_text, summarize_dataset, start_glove_warmup, glove_status
 
 # Config
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -38,11 +40,23 @@ _LOG = logging.getLogger("text_summarizer_app")
 app = Flask(__name__, static_folder=FRONTEND_BUILD, static_url_path="/")
 CORS(app)
 
+# load GloVe in the background; until it is ready summaries use the TF-IDF path
+start_glove_warmup()
+
 
 def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXT
 
 
+def _optional_int(value) -> Optional[int]:
+    """Positive int from a request field, or None when missing / invalid."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
 def _get_default_dataset_path() -> str:
     """Prefer TASK.xlsx in backend else most recent file in uploads."""
     if os.path.exists(TASK_XLSX):
@@ -71,11 +85,21 @@ def ping():
     return jsonify(status="ok", time=datetime.utcnow().isoformat())
 
 
+@app.route("/api/ready", methods=["GET"])
+def ready():
+    """
+    Report GloVe loading state: { "ready": bool, "state": "...", "progress": 0..1, "error": ... }
+    "ready" is true once loading has finished (or GloVe is unavailable and TF-IDF is final).
+    """
+    return jsonify(**glove_status())
+
+
 @app.route("/api/summarize", methods=["POST"])
 def api_summarize():
     """
     Accept JSON body with:
     { "text": "some text", "sentences": 3 }
+    Optional "max_chars" / "max_tokens" replace the sentence count with a length budget.
     Returns: { "summary": "..." }
     This handler will return a traceback field on error for debugging (remove after fix).
     """
@@ -91,9 +115,13 @@ def api_summarize():
         # attempt to read form fields
         text = request.form.get("text") or request.values.get("text") or ""
         n = request.form.get("sentences") or request.values.get("sentences") or request.form.get("n") or request.values.get("n") or 3
+        max_chars = _optional_int(request.values.get("max_chars"))
+        max_tokens = _optional_int(request.values.get("max_tokens"))
     else:
         text = data.get("text") or data.get("input") or ""
         n = data.get("sentences", data.get("n", 3))
+        max_chars = _optional_int(data.get("max_chars"))
+        max_tokens = _optional_int(data.get("max_tokens"))
 
     try:
         n = int(n)
@@ -104,8 +132,8 @@ def api_summarize():
         return jsonify(error="No text provided. Provide JSON { 'text': '...', 'sentences': 3 }"), 400
 
     try:
-        _LOG.info("Summarizing text (len=%d) n=%d", len(text), n)
-        summ = summary_text(text, n)
+        _LOG.info("Summarizing text (len=%d) n=%d max_chars=%s max_tokens=%s", len(text), n, max_chars, max_tokens)
+        summ = summary_text(text, n, max_chars=max_chars, max_tokens=max_tokens)
         return jsonify(summary=summ)
     except Exception as exc:
         # DEBUG: return traceback in response so frontend shows details (remove in production)
@@ -120,13 +148,15 @@ def api_summarize():
 def api_summarize_dataset():
     """
     Summarize default dataset (TASK.xlsx or latest uploaded).
-    Query param: n=3
+    Query params: n=3, or max_chars / max_tokens for a length budget per summary
     """
     n = request.args.get("n", default=3)
     try:
         n = int(n)
     except Exception:
         n = 3
+    max_chars = _optional_int(request.args.get("max_chars"))
+    max_tokens = _optional_int(request.args.get("max_tokens"))
 
     try:
         dataset_path = _get_default_dataset_path()
@@ -135,7 +165,8 @@ def api_summarize_dataset():
 
     try:
         _LOG.info("Summarizing dataset %s n=%d", dataset_path, n)
-        results = summarize_dataset(excel_path=dataset_path, n=n, save_csv=True)
+        results = summarize_dataset(excel_path=dataset_path, n=n, save_csv=True, max_chars=max_chars,
+                                    max_tokens=max_tokens)
         return jsonify(count=len(results), results=results)
     except Exception as exc:
         _LOG.exception("Error summarizing dataset: %s", exc)
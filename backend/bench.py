@@ -0,0 +1,283 @@
+"""
+backend/bench.py
+
+Benchmarks / quality reports for the summarizer. Run from backend/:
+
+- python bench.py storage [--corpus TASK.xlsx] [--n 3]
+  # summary overlap of float16 / int8 embedding storage against the float32 baseline
+- python bench.py tfidf [--corpus TASK.xlsx] [--sentences 5000]
+  # time / peak memory of TF-IDF vectors + similarity: dense (toarray + cosine_similarity) vs sparse
+- python bench.py pagerank [--corpus TASK.xlsx] [--sizes 500,2000]
+  # ranking.pagerank vs networkx (graph build + pagerank): latency and max score difference;
+  # needs networkx installed (it is no longer a runtime dependency)
+- python bench.py batch [--corpus TASK.xlsx] [--docs 10000] [--sentences 5]
+  # ranking many short texts: networkx / pagerank per doc vs one pagerank_batch solve,
+  # and summary_text per row vs summarize_texts end to end
+- python bench.py segment [--corpus TASK.xlsx]
+  # segmenter.py vs NLTK punkt: MB/s (whole corpus and per document) and sentence boundary
+  # agreement; punkt is the model in NLTK_DATA_DIR, or one trained on the corpus when none is bundled
+
+The storage benchmark needs a GloVe file where summarizer.py looks for it (glove.6B.100d.txt in backend/).
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import summarizer
+from embeddings import STORAGE_MODES, open_embedding_table
+
+
+def _glove_path() -> str:
+    for p in summarizer._GLOVE_PATHS:
+        if os.path.exists(p) and os.path.getsize(p) > 0:
+            return p
+    sys.exit("GloVe file not found (looked in %s)" % summarizer._GLOVE_PATHS)
+
+
+def _summaries(texts, n):
+    return [summarizer.summary_text(t, n) for t in texts]
+
+
+def _overlap(a: str, b: str) -> float:
+    """Jaccard overlap of the sentence sets of two summaries (1.0 when both are empty)."""
+    sa, sb = set(summarizer._sent_tokenize(a)) if a else set(), set(summarizer._sent_tokenize(b)) if b else set()
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def bench_storage(args) -> None:
+    texts = [t for t in summarizer._read_dataset_texts(args.corpus) if t.strip()]
+    path = _glove_path()
+    baseline = None
+    print("%-8s %10s %10s %10s %8s" % ("storage", "MB", "sec", "overlap", "exact"))
+    for storage in STORAGE_MODES:
+        table = open_embedding_table(path, storage=storage)
+        summarizer._glove, summarizer._glove_dim = table, table.dim
+        t0 = time.perf_counter()
+        out = _summaries(texts, args.n)
+        elapsed = time.perf_counter() - t0
+        if baseline is None:
+            baseline = out
+        overlaps = [_overlap(a, b) for a, b in zip(baseline, out)]
+        exact = sum(a == b for a, b in zip(baseline, out)) / max(len(out), 1)
+        print("%-8s %10.1f %10.2f %10.4f %8.4f" % (storage, table.nbytes / 2**20, elapsed,
+                                                   sum(overlaps) / max(len(overlaps), 1), exact))
+
+
+def _measure(fn):
+    """Run fn once; return (result, seconds, peak traced MB)."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, elapsed, peak / 2**20
+
+
+def _long_document(corpus: str, sentences: int):
+    """Prepared (no-stopword) sentences of one synthetic long document built from the corpus."""
+    out = []
+    for t in summarizer._read_dataset_texts(corpus):
+        interner = summarizer._get_interner()
+        sent_tokens = summarizer._prepare_sentences(t, interner)[1]
+        out.extend(summarizer._token_texts([toks for toks in sent_tokens if len(toks)], interner))
+        if len(out) >= sentences:
+            break
+    return out[:sentences]
+
+
+def bench_tfidf(args) -> None:
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    sents = _long_document(args.corpus, args.sentences)
+
+    def dense():
+        vecs = summarizer._sentence_vectors_with_tfidf(sents, mode="document").toarray()
+        return cosine_similarity(vecs)
+
+    def sparse():
+        vecs = summarizer._sentence_vectors_with_tfidf(sents, mode="document")
+        return summarizer._sparse_cosine_similarity(vecs)
+
+    print("sentences=%d" % len(sents))
+    print("%-8s %10s %12s %12s" % ("path", "sec", "peak MB", "sim nnz"))
+    for name, fn in (("dense", dense), ("sparse", sparse)):
+        sim, elapsed, peak = _measure(fn)
+        nnz = sim.nnz if hasattr(sim, "nnz") else int((sim != 0).sum())
+        print("%-8s %10.3f %12.1f %12d" % (name, elapsed, peak, nnz))
+
+
+def bench_pagerank(args) -> None:
+    import networkx as nx
+    import numpy as np
+    from ranking import pagerank
+
+    def nx_scores(sim):
+        ranks = nx.pagerank(nx.from_numpy_array(sim))
+        return np.array([ranks[i] for i in range(sim.shape[0])])
+
+    def sims_for(doc_sents):
+        vecs = summarizer._sentence_vectors_with_tfidf(doc_sents, mode="document")
+        return summarizer._sparse_cosine_similarity(vecs).toarray()
+
+    cases = []
+    docs = []
+    for t in summarizer._read_dataset_texts(args.corpus):
+        interner = summarizer._get_interner()
+        sent_tokens = summarizer._prepare_sentences(t, interner)[1]
+        sents = summarizer._token_texts([toks for toks in sent_tokens if len(toks)], interner)
+        if len(sents) > 2:
+            docs.append(sims_for(sents))
+    cases.append(("corpus docs (%d)" % len(docs), docs))
+    for size in [int(x) for x in args.sizes.split(",") if x]:
+        cases.append(("1 doc, m=%d" % size, [sims_for(_long_document(args.corpus, size))]))
+
+    print("%-22s %12s %12s %8s %12s" % ("case", "networkx s", "numpy s", "speedup", "max |diff|"))
+    for name, sims in cases:
+        t0 = time.perf_counter()
+        ref = [nx_scores(s) for s in sims]
+        t_nx = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = [pagerank(s) for s in sims]
+        t_np = time.perf_counter() - t0
+        diff = max(float(np.abs(a - b).max()) for a, b in zip(ref, got))
+        print("%-22s %12.3f %12.3f %7.1fx %12.2e" % (name, t_nx, t_np, t_nx / max(t_np, 1e-9), diff))
+
+
+def bench_batch(args) -> None:
+    import numpy as np
+    from ranking import pagerank, pagerank_batch
+
+    base = [t for t in summarizer._read_dataset_texts(args.corpus) if t.strip()]
+    texts = []
+    for i in range(args.docs):
+        sents = summarizer._sent_tokenize(base[i % len(base)])
+        texts.append(" ".join(sents[: args.sentences]))
+    sims = []
+    for t in texts:
+        interner = summarizer._get_interner()
+        sent_tokens = summarizer._prepare_sentences(t, interner)[1]
+        sims.append(summarizer._similarity_graph(summarizer._sentence_vectors_with_hashing(
+            summarizer._token_texts(sent_tokens, interner))))
+
+    rows = []
+    try:
+        import networkx as nx
+
+        t0 = time.perf_counter()
+        for s in sims:
+            nx.pagerank(nx.from_scipy_sparse_array(s))
+        rows.append(("networkx per doc", time.perf_counter() - t0))
+    except ImportError:
+        pass
+    t0 = time.perf_counter()
+    single = [pagerank(s) for s in sims]
+    rows.append(("pagerank per doc", time.perf_counter() - t0))
+    t0 = time.perf_counter()
+    batched, converged = pagerank_batch(sims)
+    rows.append(("pagerank_batch", time.perf_counter() - t0))
+    diff = max(float(np.abs(a - b).max()) for a, b in zip(single, batched))
+
+    t0 = time.perf_counter()
+    for t in texts:
+        try:
+            summarizer.summary_text(t, 2)
+        except Exception:
+            pass
+    rows.append(("summary_text per row", time.perf_counter() - t0))
+    t0 = time.perf_counter()
+    summarizer.summarize_texts(texts, 2)
+    rows.append(("summarize_texts", time.perf_counter() - t0))
+
+    print("docs=%d sentences<=%d converged=%d max |batch - single|=%.2e"
+          % (len(texts), args.sentences, int(converged.sum()), diff))
+    for name, sec in rows:
+        print("%-22s %10.3f s" % (name, sec))
+
+
+def _punkt_for(texts):
+    """(punkt tokenizer, description): the bundled model, else unsupervised Punkt trained on texts."""
+    punkt = summarizer._punkt_tokenizer(summarizer.NLTK_DATA_DIR)
+    if punkt is not None:
+        return punkt, "bundled model"
+    from nltk.tokenize.punkt import PunktSentenceTokenizer, PunktTrainer
+
+    trainer = PunktTrainer()
+    trainer.train("\n\n".join(texts), finalize=True)
+    return PunktSentenceTokenizer(trainer.get_params()), "trained on the corpus (no bundled model)"
+
+
+def bench_segment(args) -> None:
+    import re
+    from segmenter import sentence_spans
+
+    texts = [t for t in summarizer._read_dataset_texts(args.corpus) if t.strip()]
+    corpus = "\n\n".join(texts)
+    mb = len(corpus.encode("utf-8")) / 2**20
+    punkt, source = _punkt_for(texts)
+
+    def naive(text):
+        # the previous fallback: re.split(r"(?<=[.!?])\s+", text), as offsets
+        cuts = [0] + [x for m in re.finditer(r"(?<=[.!?])\s+", text) for x in (m.start(), m.end())] + [len(text)]
+        return [(a, b) for a, b in zip(cuts[::2], cuts[1::2]) if text[a:b].strip()]
+
+    splitters = [("punkt", lambda t: list(punkt.span_tokenize(t))), ("rules", sentence_spans), ("naive regex", naive)]
+    print("corpus: %d texts, %.2f MB; punkt: %s" % (len(texts), mb, source))
+    print("%-12s %14s %14s %10s %12s %10s" % ("splitter", "MB/s (corpus)", "MB/s (per doc)", "sentences",
+                                              "boundary agr", "docs same"))
+    ref = [set(e for _, e in punkt.span_tokenize(t)) for t in texts]
+    for name, fn in splitters:
+        t0 = time.perf_counter()
+        fn(corpus)
+        whole = mb / (time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        spans = [fn(t) for t in texts]
+        per_doc = mb / (time.perf_counter() - t0)
+        ends = [set(e for _, e in s) for s in spans]
+        inter = sum(len(a & b) for a, b in zip(ends, ref))
+        union = sum(len(a | b) for a, b in zip(ends, ref))
+        same = sum(a == b for a, b in zip(ends, ref)) / len(texts)
+        print("%-12s %14.2f %14.2f %10d %12.4f %10.4f" % (name, whole, per_doc, sum(len(s) for s in spans),
+                                                          inter / max(union, 1), same))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("storage", help="float16/int8 embedding storage vs float32 summaries")
+    p.add_argument("--corpus", default="TASK.xlsx")
+    p.add_argument("--n", type=int, default=3)
+    p.set_defaults(func=bench_storage)
+
+    p = sub.add_parser("tfidf", help="dense vs sparse TF-IDF similarity on one long document")
+    p.add_argument("--corpus", default="TASK.xlsx")
+    p.add_argument("--sentences", type=int, default=5000)
+    p.set_defaults(func=bench_tfidf)
+
+    p = sub.add_parser("pagerank", help="numpy/scipy PageRank vs networkx")
+    p.add_argument("--corpus", default="TASK.xlsx")
+    p.add_argument("--sizes", default="500,2000")
+    p.set_defaults(func=bench_pagerank)
+
+    p = sub.add_parser("batch", help="batched PageRank / summarize_texts over many short texts")
+    p.add_argument("--corpus", default="TASK.xlsx")
+    p.add_argument("--docs", type=int, default=10000)
+    p.add_argument("--sentences", type=int, default=5)
+    p.set_defaults(func=bench_batch)
+
+    p = sub.add_parser("segment", help="rule-based segmenter vs NLTK punkt: speed and agreement")
+    p.add_argument("--corpus", default="TASK.xlsx")
+    p.set_defaults(func=bench_segment)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,661 @@
+"""
+backend/embeddings.py
+
+Word-embedding loading with a binary on-disk cache:
+- load_glove_matrix(path, mmap=False, member=None) -> (vocab, matrix)   # vocab: list[str], matrix: float32 (V, dim)
+- open_embedding_table(path) -> EmbeddingTable              # token -> id index over a memory-mapped matrix
+- corpus_vocab(texts, token_re=None) -> set[str]           # tokens of a corpus, for vocab-restricted loading
+- quantize_matrix(matrix, storage) -> (data, scales)        # float16 / int8-with-per-row-scale storage
+- detect_format(path, member=None) / register_loader(fmt, loader)   # pluggable source formats
+
+Sources can be plain, .gz, .bz2 or a member of a .zip (e.g. glove.6B.zip), holding GloVe text,
+word2vec/fastText .vec text (header line skipped) or word2vec binary (.bin). Compressed sources
+are decompressed as a stream straight into the parser; nothing is extracted to disk.
+
+The first load of a source parses it once and writes three files to the cache dir:
+- <name>.npy        # contiguous float32 matrix, one row per word
+- <name>.vocab.txt  # one word per line, same order as the matrix rows
+- <name>.meta.json  # fingerprint of the source file (size / mtime / sampled sha1)
+Later loads read the .npy + vocab directly. The cache is rebuilt automatically when the
+source fingerprint no longer matches.
+
+The table opens the cached .npy with mmap_mode="r", so every worker process maps the same
+file and shares its page-cache pages instead of holding a private copy of the vectors.
+Reduced-precision tables (storage="float16" / "int8") are cached next to it the same way;
+gather() always returns float32 so sentence vectors are accumulated in full precision.
+
+The app's warm-up thread parses a cold source in-process (see PARSE_WORKERS). To use every
+core, build the cache once beforehand from a single-threaded process (run from backend/):
+    python embeddings.py glove.6B.100d.txt [--member glove.6B.100d.txt] [--storage int8]
+"""
+
+from typing import BinaryIO, Callable, Iterable, List, Optional, Set, Tuple
+import os
+import re
+import bz2
+import gzip
+import json
+import hashlib
+import logging
+import zipfile
+import threading
+import contextlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+_LOG = logging.getLogger(__name__)
+
+# Cache directory (override with GLOVE_CACHE_DIR).
+CACHE_DIR = os.environ.get("GLOVE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "glove_cache"))
+
+_CACHE_VERSION = 1
+# bytes hashed from the head and tail of the source file; hashing the full 300MB+ file on
+# every start would cost more than loading the cache itself.
+_HASH_SAMPLE = 1 << 20
+
+# Storage dtypes for the embedding matrix. int8 rows carry a float32 scale (max |v| / 127).
+STORAGE_MODES = ("float32", "float16", "int8")
+_QUANT_CHUNK = 65536
+
+# Cold text parse: the file is split into newline-aligned byte ranges parsed in a process
+# pool (GLOVE_PARSE_WORKERS, default: all cores; 1 = parse in-process). The pool forks, so it
+# is only used while the process has a single thread; a load from a threaded server (e.g. the
+# app's GloVe warm-up thread next to Flask request threads) parses in-process instead; build
+# the cache ahead with `python embeddings.py <path>` (see main) to get the parallel parse.
+PARSE_WORKERS = int(os.environ.get("GLOVE_PARSE_WORKERS", "0")) or (os.cpu_count() or 1)
+_PARSE_CHUNK_BYTES = 16 << 20
+
+
+def _file_fingerprint(path: str) -> dict:
+    """Cheap identity of a source file: size, mtime and sha1 of its first/last MB."""
+    st = os.stat(path)
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        h.update(fh.read(_HASH_SAMPLE))
+        if st.st_size > _HASH_SAMPLE:
+            fh.seek(max(_HASH_SAMPLE, st.st_size - _HASH_SAMPLE))
+            h.update(fh.read(_HASH_SAMPLE))
+    return {"version": _CACHE_VERSION, "size": st.st_size, "mtime": int(st.st_mtime), "sha1": h.hexdigest()}
+
+
+def _cache_stem(source: str, member: Optional[str] = None) -> str:
+    """
+    Cache file stem: source (or archive member) name without compression / format extensions.
+    A member also gets a hash of its full in-archive path, so a/vec.txt and b/vec.txt differ.
+    """
+    name = os.path.basename(member or source)
+    stem, ext = os.path.splitext(name)
+    while ext.lower() in (".gz", ".bz2", ".zip", ".txt", ".vec", ".bin"):
+        name = stem
+        stem, ext = os.path.splitext(name)
+    if member:
+        key = os.path.basename(source) + ":" + member
+        name += "." + hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    return name
+
+
+def _cache_paths(source: str, member: Optional[str] = None) -> Tuple[str, str, str]:
+    base = os.path.join(CACHE_DIR, _cache_stem(source, member))
+    return base + ".npy", base + ".vocab.txt", base + ".meta.json"
+
+
+def _chunk_ranges(path: str, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split a file into [start, end) byte ranges of ~chunk_bytes that end on a newline."""
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as fh:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                fh.seek(end)
+                fh.readline()
+                end = fh.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _dim_of_lines(lines: Iterable[str]) -> Optional[int]:
+    """Vector dimension from the first valid line (word + at least 2 values; skips .vec headers)."""
+    for line in lines:
+        parts = line.split()
+        if len(parts) > 2:
+            return len(parts) - 1
+    return None
+
+
+def _parse_lines_slow(lines: List[str], dim: int) -> Tuple[List[str], np.ndarray]:
+    """Line-by-line parse; skips short lines and lines whose width differs from dim."""
+    words = []
+    rows = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) <= 2 or len(parts) - 1 != dim:
+            continue
+        words.append(parts[0])
+        rows.append(np.asarray(parts[1:], dtype="float32"))
+    if not rows:
+        return [], np.zeros((0, dim), dtype="float32")
+    return words, np.vstack(rows)
+
+
+def _parse_block(block: str, dim: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse a block of whole lines. Fast path: peel the word off each line, then parse all numbers
+    of the block with a single np.fromstring call. Falls back to the line-by-line parse when the
+    block holds malformed lines (the value count does not come out to len(words) * dim).
+    """
+    lines = [ln for ln in block.split("\n") if ln.strip()]
+    words = []
+    values = []
+    for ln in lines:
+        word, _, rest = ln.strip().partition(" ")
+        words.append(word)
+        values.append(rest)
+    try:
+        flat = np.fromstring(" ".join(values), dtype="float32", sep=" ")
+    except ValueError:
+        return _parse_lines_slow(lines, dim)
+    if flat.size != len(words) * dim:
+        return _parse_lines_slow(lines, dim)
+    return words, flat.reshape(len(words), dim)
+
+
+def _parse_chunk(path: str, start: int, end: int, dim: int) -> Tuple[List[str], np.ndarray]:
+    """Parse the [start, end) byte range of an uncompressed text file."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        return _parse_block(fh.read(end - start).decode("utf-8", errors="ignore"), dim)
+
+
+def _parse_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # fork: spawn would re-import the caller's __main__ (app.py) in every child. Forking a
+        # multi-threaded process can deadlock a child on a lock another thread held at fork time.
+        if threading.active_count() > 1:
+            _LOG.info("Parsing embeddings in-process: other threads are running, not forking a pool")
+            return None
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    return None
+
+
+def _stitch(results: List[Tuple[List[str], np.ndarray]], dim: int) -> Tuple[List[str], np.ndarray]:
+    """Concatenate per-block (words, rows) results, in order, into one matrix."""
+    words = [w for block_words, _ in results for w in block_words]
+    if not words:
+        return [], np.zeros((0, 0), dtype="float32")
+    matrix = np.empty((len(words), dim), dtype="float32")
+    row = 0
+    for _, block in results:
+        matrix[row:row + len(block)] = block
+        row += len(block)
+    return words, matrix
+
+
+def _parse_text_file(path: str, progress: Optional[Callable[[float], None]] = None,
+                     workers: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse an uncompressed text file ("word v1 v2 ... vd" per line) into (vocab, matrix).
+    Newline-aligned byte ranges are parsed in a process pool and stitched back in file order.
+    progress, if given, is called with the fraction of chunks parsed so far.
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        dim = _dim_of_lines(fh)
+    if dim is None:
+        return [], np.zeros((0, 0), dtype="float32")
+    ranges = _chunk_ranges(path, _PARSE_CHUNK_BYTES)
+    results = [None] * len(ranges)
+    pool = _parse_pool(min(workers or PARSE_WORKERS, len(ranges)))
+    if pool is not None:
+        with pool:
+            futures = {pool.submit(_parse_chunk, path, a, b, dim): i for i, (a, b) in enumerate(ranges)}
+            for done, fut in enumerate(as_completed(futures), start=1):
+                results[futures[fut]] = fut.result()
+                if progress is not None:
+                    progress(done / len(ranges))
+    else:
+        for i, (a, b) in enumerate(ranges):
+            results[i] = _parse_chunk(path, a, b, dim)
+            if progress is not None:
+                progress((i + 1) / len(ranges))
+    return _stitch(results, dim)
+
+
+def _parse_text_stream(stream: BinaryIO, position: Callable[[], float],
+                       progress: Optional[Callable[[float], None]] = None,
+                       workers: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse text vectors from a (decompressing) stream. Blocks are cut at the last newline and
+    handed to the process pool as they are read, with a bounded number in flight, so nothing
+    is decompressed to disk and memory stays at a few blocks plus the result.
+    """
+    workers = workers or PARSE_WORKERS
+    pool = _parse_pool(workers)
+    results = []
+    pending = []
+    dim = None
+    tail = b""
+    try:
+        while True:
+            data = stream.read(_PARSE_CHUNK_BYTES)
+            if data:
+                buf = tail + data
+                cut = buf.rfind(b"\n") + 1
+                if cut == 0:
+                    tail = buf
+                    continue
+                block, tail = buf[:cut], buf[cut:]
+            else:
+                block, tail = tail, b""
+            text = block.decode("utf-8", errors="ignore")
+            if dim is None:
+                dim = _dim_of_lines(text.split("\n"))
+            if dim is not None and text:
+                if pool is None:
+                    results.append(_parse_block(text, dim))
+                else:
+                    pending.append(pool.submit(_parse_block, text, dim))
+                    if len(pending) >= 2 * workers:
+                        results.append(pending.pop(0).result())
+            if progress is not None:
+                progress(position())
+            if not data:
+                break
+        results.extend(f.result() for f in pending)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if dim is None:
+        return [], np.zeros((0, 0), dtype="float32")
+    return _stitch(results, dim)
+
+
+def _parse_word2vec_bin(stream: BinaryIO, position: Callable[[], float],
+                        progress: Optional[Callable[[float], None]] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Parse the word2vec binary format: "V dim\\n" header, then per word "<word> " followed by
+    dim little-endian float32 values (optionally followed by a newline).
+    """
+    header = stream.readline().split()
+    if len(header) != 2:
+        raise ValueError("Not a word2vec binary file (bad header)")
+    count, dim = int(header[0]), int(header[1])
+    record = dim * 4
+    words = []
+    matrix = np.empty((count, dim), dtype="float32")
+    buf = b""
+    pos = 0
+    eof = False
+    for i in range(count):
+        while True:
+            sp = buf.find(b" ", pos)
+            if sp != -1 and len(buf) >= sp + 1 + record:
+                break
+            more = stream.read(1 << 20)
+            if not more:
+                eof = True
+                break
+            buf = buf[pos:] + more
+            pos = 0
+        if eof:
+            _LOG.warning("word2vec file ended after %d of %d vectors.", i, count)
+            matrix = matrix[:i]
+            break
+        words.append(buf[pos:sp].lstrip(b"\n").decode("utf-8", errors="ignore"))
+        matrix[i] = np.frombuffer(buf, dtype="<f4", count=dim, offset=sp + 1)
+        pos = sp + 1 + record
+        if progress is not None and i % 50000 == 0:
+            progress(position())
+    return words, matrix
+
+
+# --- source detection: compression, archive member and vector format ---
+_MAGIC = {b"\x1f\x8b": "gz", b"BZh": "bz2", b"PK\x03\x04": "zip"}
+_FASTTEXT_BIN_MAGIC = (793712314).to_bytes(4, "little")
+
+
+def _compression(path: str) -> Optional[str]:
+    with open(path, "rb") as fh:
+        head = fh.read(4)
+    for magic, kind in _MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def _zip_member(zf: zipfile.ZipFile, member: Optional[str]) -> str:
+    if member:
+        return member
+    names = [n for n in zf.namelist() if os.path.splitext(n)[1].lower() in (".txt", ".vec", ".bin")]
+    if len(names) != 1:
+        raise ValueError(f"Archive holds {len(names)} vector files; pick one with member=. Found: {names}")
+    return names[0]
+
+
+@contextlib.contextmanager
+def _open_source(path: str, member: Optional[str] = None):
+    """Yield (binary stream, position()) for a plain / .gz / .bz2 file or a .zip member."""
+    kind = _compression(path)
+    size = max(os.path.getsize(path), 1)
+    with open(path, "rb") as raw:
+        if kind == "zip":
+            with zipfile.ZipFile(raw) as zf:
+                info = zf.getinfo(_zip_member(zf, member))
+                with zf.open(info) as fh:
+                    yield fh, lambda: fh.tell() / max(info.file_size, 1)
+            return
+        if kind == "gz":
+            stream = gzip.GzipFile(fileobj=raw)
+        elif kind == "bz2":
+            stream = bz2.BZ2File(raw)
+        else:
+            stream = raw
+        with stream:
+            yield stream, lambda: raw.tell() / size
+
+
+def detect_format(path: str, member: Optional[str] = None) -> str:
+    """Vector format of a source: "text" (GloVe / word2vec .vec) or "word2vec-bin"."""
+    name = (member or os.path.basename(path)).lower()
+    for ext in (".gz", ".bz2", ".zip"):
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+    if not name.endswith(".bin"):
+        return "text"
+    with _open_source(path, member) as (fh, _):
+        if fh.read(4) == _FASTTEXT_BIN_MAGIC:
+            raise ValueError("fastText .bin models are not supported; use the matching .vec file")
+    return "word2vec-bin"
+
+
+def _load_text(path: str, member: Optional[str], progress: Optional[Callable[[float], None]]):
+    if member is None and _compression(path) is None:
+        return _parse_text_file(path, progress=progress)
+    with _open_source(path, member) as (fh, position):
+        return _parse_text_stream(fh, position, progress=progress)
+
+
+def _load_word2vec_bin(path: str, member: Optional[str], progress: Optional[Callable[[float], None]]):
+    with _open_source(path, member) as (fh, position):
+        return _parse_word2vec_bin(fh, position, progress=progress)
+
+
+# format name -> loader(path, member, progress) -> (vocab, float32 matrix)
+_LOADERS = {"text": _load_text, "word2vec-bin": _load_word2vec_bin}
+
+
+def register_loader(fmt: str, loader: Callable) -> None:
+    """Add or replace the loader used for a format name returned by detect_format()."""
+    _LOADERS[fmt] = loader
+
+
+def _parse_source(path: str, member: Optional[str] = None,
+                  progress: Optional[Callable[[float], None]] = None) -> Tuple[List[str], np.ndarray]:
+    return _LOADERS[detect_format(path, member)](path, member, progress)
+
+
+def _read_cache(source: str, fingerprint: dict, mmap: bool = False,
+                member: Optional[str] = None) -> Optional[Tuple[List[str], np.ndarray]]:
+    npy_path, vocab_path, meta_path = _cache_paths(source, member)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("fingerprint") != fingerprint or meta.get("member") != member:
+            _LOG.info("GloVe cache at %s is stale; rebuilding.", meta_path)
+            return None
+        matrix = np.load(npy_path, mmap_mode="r" if mmap else None)
+        with open(vocab_path, "r", encoding="utf-8") as fh:
+            vocab = fh.read().split("\n")
+    except (OSError, ValueError):
+        return None
+    if len(vocab) != matrix.shape[0]:
+        _LOG.warning("GloVe cache at %s is inconsistent; rebuilding.", meta_path)
+        return None
+    return vocab, matrix
+
+
+def _write_cache(source: str, fingerprint: dict, vocab: List[str], matrix: np.ndarray,
+                 member: Optional[str] = None) -> None:
+    """Write the cache atomically (tmp file + rename) so concurrent workers never see a partial file."""
+    npy_path, vocab_path, meta_path = _cache_paths(source, member)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        suffix = ".tmp%d" % os.getpid()
+        with open(npy_path + suffix, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(matrix, dtype="float32"))
+        with open(vocab_path + suffix, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(vocab))
+        with open(meta_path + suffix, "w", encoding="utf-8") as fh:
+            json.dump({"source": os.path.abspath(source), "member": member, "fingerprint": fingerprint,
+                       "rows": int(matrix.shape[0]), "dim": int(matrix.shape[1])}, fh)
+        # meta goes last: it is the marker that the other two files are complete
+        os.replace(npy_path + suffix, npy_path)
+        os.replace(vocab_path + suffix, vocab_path)
+        os.replace(meta_path + suffix, meta_path)
+        _LOG.info("Wrote GloVe binary cache to %s", npy_path)
+    except OSError as e:
+        _LOG.warning("Could not write GloVe cache to %s: %s", CACHE_DIR, e)
+
+
+def load_glove_matrix(path: str, mmap: bool = False, progress: Optional[Callable[[float], None]] = None,
+                      member: Optional[str] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Return (vocab, float32 matrix) for an embedding file, using/refreshing the binary cache.
+    path may be plain, .gz, .bz2 or a .zip (member picks the file inside; optional if there is
+    only one), holding GloVe / word2vec text or word2vec binary vectors (see detect_format).
+    With mmap=True the matrix is a read-only memory map of the cache file (falls back to an
+    in-memory array if the cache could not be written). progress receives parse progress (0..1).
+    """
+    fingerprint = _file_fingerprint(path)
+    cached = _read_cache(path, fingerprint, mmap=mmap, member=member)
+    if cached is not None:
+        _LOG.info("Loaded GloVe from binary cache (%d words).", len(cached[0]))
+        return cached
+    _LOG.info("Parsing embeddings %s%s ... (one-time, this may take a minute)", path, ":" + member if member else "")
+    vocab, matrix = _parse_source(path, member=member, progress=progress)
+    if vocab:
+        _write_cache(path, fingerprint, vocab, matrix, member=member)
+        if mmap:
+            # re-open what we just wrote so this process maps the shared file too
+            cached = _read_cache(path, fingerprint, mmap=True, member=member)
+            if cached is not None:
+                return cached
+    return vocab, matrix
+
+
+def quantize_matrix(matrix: np.ndarray, storage: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Convert a float32 matrix to the given storage mode; returns (data, per-row scales or None).
+    Works in row chunks so a memory-mapped source is never copied whole in float32.
+    """
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown embedding storage {storage!r}; expected one of {STORAGE_MODES}")
+    if storage == "float32":
+        return matrix, None
+    rows = matrix.shape[0]
+    data = np.empty(matrix.shape, dtype=storage)
+    scales = np.empty((rows,), dtype="float32") if storage == "int8" else None
+    for start in range(0, rows, _QUANT_CHUNK):
+        block = np.asarray(matrix[start:start + _QUANT_CHUNK], dtype="float32")
+        if storage == "float16":
+            data[start:start + len(block)] = block
+            continue
+        scale = np.abs(block).max(axis=1) / 127.0
+        safe = np.where(scale > 0, scale, 1.0)
+        data[start:start + len(block)] = np.clip(np.rint(block / safe[:, None]), -127, 127)
+        scales[start:start + len(block)] = scale
+    return data, scales
+
+
+def _quantized_cache_paths(source: str, fingerprint: dict, storage: str,
+                           member: Optional[str] = None) -> Tuple[str, str]:
+    npy_path = _cache_paths(source, member)[0]
+    # a hash of the whole fingerprint (size, mtime, sampled sha1) in the name ties the derived
+    # files to one version of the source, like the meta check in _read_cache
+    key = hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    base = "%s.%s.%s" % (npy_path[:-len(".npy")], key, storage)
+    return base + ".npy", base + ".scale.npy"
+
+
+def _load_quantized(source: str, matrix: np.ndarray, storage: str,
+                    member: Optional[str] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Memory-mapped reduced-precision copy of the cached matrix; built and cached on first use."""
+    fingerprint = _file_fingerprint(source)
+    data_path, scale_path = _quantized_cache_paths(source, fingerprint, storage, member)
+    try:
+        data = np.load(data_path, mmap_mode="r")
+        scales = np.load(scale_path) if storage == "int8" else None
+        if data.shape == matrix.shape:
+            return data, scales
+    except (OSError, ValueError):
+        pass
+    _LOG.info("Building %s copy of the GloVe matrix ...", storage)
+    data, scales = quantize_matrix(matrix, storage)
+    try:
+        suffix = ".tmp%d" % os.getpid()
+        if scales is not None:
+            with open(scale_path + suffix, "wb") as fh:
+                np.save(fh, scales)
+            os.replace(scale_path + suffix, scale_path)
+        with open(data_path + suffix, "wb") as fh:
+            np.save(fh, data)
+        os.replace(data_path + suffix, data_path)
+        data = np.load(data_path, mmap_mode="r")
+    except OSError as e:
+        _LOG.warning("Could not cache %s GloVe matrix: %s", storage, e)
+    return data, scales
+
+
+class EmbeddingTable:
+    """
+    One contiguous (V, dim) matrix plus a token -> id mapping.
+    The matrix is stored as float32, float16 or int8 (with a float32 scale per row).
+    Lookups are batched: lookup_ids() maps a list of tokens to an int array (-1 for OOV)
+    and gather() returns the matching rows as float32, with zero rows for OOV ids.
+    """
+
+    def __init__(self, vocab: List[str], matrix: np.ndarray, scales: Optional[np.ndarray] = None):
+        if not isinstance(matrix, np.memmap):
+            matrix = np.ascontiguousarray(matrix)
+            if matrix.dtype not in (np.float16, np.int8):
+                matrix = matrix.astype("float32", copy=False)
+        self.vocab = vocab
+        self.index = {w: i for i, w in enumerate(vocab)}
+        self.matrix = matrix
+        self.scales = scales
+        self.dim = int(matrix.shape[1]) if matrix.ndim == 2 else 0
+
+    @property
+    def storage(self) -> str:
+        return str(self.matrix.dtype)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vectors (matrix + scales)."""
+        return int(self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.index
+
+    def lookup_ids(self, tokens: List[str]) -> np.ndarray:
+        """Return int64 ids for tokens; -1 marks out-of-vocabulary tokens."""
+        get = self.index.get
+        return np.fromiter((get(t, -1) for t in tokens), dtype=np.int64, count=len(tokens))
+
+    def gather(self, ids: np.ndarray) -> np.ndarray:
+        """Return a (len(ids), dim) float32 array of rows; OOV ids (-1) give zero rows."""
+        ids = np.asarray(ids, dtype=np.int64)
+        oov = ids < 0
+        has_oov = bool(oov.any())
+        if has_oov:
+            ids = np.where(oov, 0, ids)
+        out = np.asarray(self.matrix[ids], dtype="float32")
+        if self.scales is not None:
+            out *= self.scales[ids, None]
+        if has_oov:
+            out[oov] = 0.0
+        return out
+
+
+# default token pattern of corpus_vocab: ASCII letter / digit runs, as summarizer.py tokenizes sentences
+_CORPUS_TOKEN = re.compile(r"[a-zA-Z0-9]+")
+
+
+def corpus_vocab(texts: Iterable[str], token_re: Optional["re.Pattern"] = None) -> Set[str]:
+    """Lower-cased tokens found in texts. token_re must be the pattern the sentence vectors are
+    built with (summarizer.py passes its own), else words kept here are not the words looked up."""
+    token_re = token_re or _CORPUS_TOKEN
+    vocab = set()
+    for t in texts:
+        if t:
+            vocab.update(w.lower() for w in token_re.findall(str(t)))
+    return vocab
+
+
+def _restrict_rows(vocab: List[str], matrix: np.ndarray, keep: Optional[Set[str]] = None,
+                   top_k: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Keep only rows whose word is in keep and/or among the first top_k rows (GloVe files are
+    sorted by corpus frequency). Returns a compact in-memory copy of the selected rows.
+    """
+    limit = len(vocab) if top_k is None else min(int(top_k), len(vocab))
+    if keep is None:
+        idx = np.arange(limit)
+    else:
+        idx = np.fromiter((i for i in range(limit) if vocab[i] in keep), dtype=np.int64)
+    return [vocab[i] for i in idx], np.ascontiguousarray(matrix[idx], dtype="float32")
+
+
+def open_embedding_table(path: str, progress: Optional[Callable[[float], None]] = None,
+                         keep: Optional[Set[str]] = None, top_k: Optional[int] = None,
+                         storage: str = "float32", member: Optional[str] = None) -> Optional[EmbeddingTable]:
+    """
+    Open the embedding file at path (any format load_glove_matrix accepts; member selects a
+    file inside a .zip) as a memory-mapped EmbeddingTable; None if it holds no vectors.
+    With keep (a word set) and/or top_k, only those rows are loaded into a small in-memory table;
+    every other word is then treated as out-of-vocabulary.
+    storage picks the matrix dtype (see STORAGE_MODES).
+    """
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown embedding storage {storage!r}; expected one of {STORAGE_MODES}")
+    vocab, matrix = load_glove_matrix(path, mmap=True, progress=progress, member=member)
+    if not vocab:
+        return None
+    scales = None
+    if keep is not None or top_k is not None:
+        full = len(vocab)
+        vocab, matrix = _restrict_rows(vocab, matrix, keep=keep, top_k=top_k)
+        _LOG.info("Restricted GloVe vocabulary: %d of %d words kept.", len(vocab), full)
+        if not vocab:
+            return None
+        matrix, scales = quantize_matrix(matrix, storage)
+    elif storage != "float32":
+        matrix, scales = _load_quantized(path, matrix, storage, member)
+    return EmbeddingTable(vocab, matrix, scales)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build the binary cache of an embedding file (parallel parse).")
+    parser.add_argument("path", help="embedding file (.txt/.vec/.bin, optionally .gz/.bz2/.zip)")
+    parser.add_argument("--member", default=None, help="file inside a .zip")
+    parser.add_argument("--storage", default=os.environ.get("GLOVE_STORAGE", "float32"), choices=STORAGE_MODES,
+                        help="also build this reduced-precision copy (default: GLOVE_STORAGE or float32)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s", level=logging.INFO)
+    member = args.member
+    if member is None and args.path.lower().endswith(".zip") and os.path.basename(args.path).startswith("glove.6B"):
+        member = "glove.6B.%sd.txt" % os.environ.get("GLOVE_DIM", "100")  # as summarizer.py picks it
+    table = open_embedding_table(args.path, storage=args.storage, member=member)
+    if table is None:
+        raise SystemExit("No embeddings found in %s" % args.path)
+    _LOG.info("Cache ready in %s: vocab=%d dim=%d storage=%s", CACHE_DIR, len(table), table.dim, table.storage)
+
+
+if __name__ == "__main__":
+    main()
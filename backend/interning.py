@@ -0,0 +1,93 @@
+"""
+backend/interning.py
+
+Token interning for the sentence-vector backends:
+- TokenInterner(stopwords, surface_cache=262144)
+  .ids(raw_tokens) -> np.ndarray        # int32 id of each raw token (lower-cased form)
+  .is_stop -> np.ndarray                # bool, indexed by id
+  .embedding_rows(table) -> np.ndarray  # int64 row of each id in an EmbeddingTable, -1 when OOV
+  .is_oov(table) -> np.ndarray          # bool, indexed by id
+  .texts(ids_per_sentence) -> list[str] # space-joined tokens, for the sklearn vectorizers
+
+Every distinct lower-cased token gets a stable integer id the first time it is seen, together
+with its stopword flag (and, per embedding table, its row / OOV flag), so repeated words cost
+one cached lookup instead of lower() + set membership + embedding dict lookup. Raw surface
+forms ("Tablet", "TABLET") map to ids through a bounded LRU (functools.lru_cache); the id
+table itself grows with every distinct token interned, so long-running callers bound it by
+replacing the interner (summarizer.py: TOKEN_TABLE_SIZE) -- ids are only valid with the
+interner that made them.
+"""
+
+from typing import Dict, Iterable, List
+import functools
+import threading
+import numpy as np
+
+
+class TokenInterner:
+    """Per-process token -> id table with id-indexed stopword and OOV arrays."""
+
+    def __init__(self, stopwords: Iterable[str], surface_cache: int = 1 << 18):
+        self._stopwords = frozenset(stopwords)
+        self._lock = threading.Lock()
+        self.index: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        self._stop = np.zeros(1024, dtype=bool)
+        self._table = None
+        self._rows = np.zeros(0, dtype=np.int64)  # embedding row per id of self._table
+        self._surface_id = functools.lru_cache(maxsize=surface_cache)(self._intern_surface)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _intern(self, token: str) -> int:
+        i = self.index.get(token)
+        if i is not None:
+            return i
+        with self._lock:
+            i = self.index.get(token)
+            if i is None:
+                i = len(self.tokens)
+                if i == len(self._stop):
+                    stop = np.zeros(2 * i, dtype=bool)
+                    stop[:i] = self._stop
+                    self._stop = stop
+                self._stop[i] = token in self._stopwords
+                self.tokens.append(token)
+                # published last: a reader that finds the id also finds its flags
+                self.index[token] = i
+        return i
+
+    def _intern_surface(self, raw: str) -> int:
+        return self._intern(raw.lower())
+
+    def ids(self, raw_tokens: List[str]) -> np.ndarray:
+        """int32 ids of raw tokens (any case); new tokens are added."""
+        return np.array(list(map(self._surface_id, raw_tokens)), dtype=np.int32)
+
+    @property
+    def is_stop(self) -> np.ndarray:
+        """Stopword flag per id (may be longer than len(self); extra entries are False)."""
+        return self._stop
+
+    def embedding_rows(self, table) -> np.ndarray:
+        """Row of every id in table (an EmbeddingTable), -1 when the token is OOV. Computed once
+        per id and table; ids added later are looked up on the next call."""
+        rows = self._rows if self._table is table else np.zeros(0, dtype=np.int64)
+        n = len(self.tokens)
+        if len(rows) < n:
+            rows = np.concatenate((rows, table.lookup_ids(self.tokens[len(rows):n])))
+            self._table, self._rows = table, rows
+        return rows
+
+    def is_oov(self, table) -> np.ndarray:
+        """OOV flag per id for table."""
+        return self.embedding_rows(table) < 0
+
+    def texts(self, ids_per_sentence: List[np.ndarray]) -> List[str]:
+        tokens = self.tokens
+        return [" ".join([tokens[i] for i in ids.tolist()]) for ids in ids_per_sentence]
+
+    def cache_info(self):
+        """functools cache statistics of the surface-form LRU."""
+        return self._surface_id.cache_info()
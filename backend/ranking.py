@@ -0,0 +1,317 @@
+"""
+backend/ranking.py
+
+Sentence-graph construction and ranking for the extractive summarizer:
+- safe_cosine_similarity(vecs) -> np.ndarray
+  # vectorized cosine similarity tolerant of zero rows, NaN and inf (zero diagonal)
+- sparsify_similarity(sim, top_k=None, threshold=None) -> scipy CSR matrix
+  # keep each sentence's top_k most similar neighbours and/or edges >= threshold
+- blocked_similarity_graph(vecs, top_k=None, threshold=None, max_bytes=...) -> scipy CSR matrix
+  # same graph as sparsify_similarity(cosine(vecs), ...), built from row blocks under max_bytes
+- degree_scores(vecs) -> np.ndarray
+  # row sums of the cosine similarity matrix (zero diagonal) without building it
+- top_n_indices(scores, n) -> np.ndarray
+  # positions of the n best-scored sentences, in document order (ties: earlier sentence wins)
+- mmr_indices(scores, sim, n, lam=0.7) -> np.ndarray
+  # Maximal Marginal Relevance pick of n sentences from the scores and the similarity graph
+- budget_indices(scores, costs, budget) -> np.ndarray
+  # high-scoring sentences whose total cost (characters / tokens) fits the budget, in document order
+- pagerank(weights, damping=0.85, tol=1e-6, max_iter=100, dangling=None) -> np.ndarray
+  # power-iteration PageRank on a dense or sparse weight matrix (same results as nx.pagerank)
+- pagerank_batch(weights_list, ...) -> (list of score arrays, converged mask)
+  # many graphs solved together as one block-diagonal sparse matrix
+
+The full m x m similarity graph is O(m^2) in memory and edges; the sparsified graph keeps at
+most ~2 * top_k edges per sentence, so ranking works on book-length inputs. When even one
+float32 m x m matrix is over the memory budget, blocked_similarity_graph computes the
+similarities a block of rows at a time and keeps only each block's sparse edges.
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+
+class PageRankConvergenceError(RuntimeError):
+    """Power iteration did not reach the tolerance within max_iter iterations."""
+
+
+def _unit_rows(vecs):
+    """Rows scaled to unit length (float32 ndarray or float64 CSR); NaN / inf entries and
+    zero rows become zero rows."""
+    if sp.issparse(vecs):
+        csr = sp.csr_matrix(vecs, dtype=np.float64, copy=True)
+        csr.data = np.nan_to_num(csr.data, nan=0.0, posinf=0.0, neginf=0.0)
+        norms = np.sqrt(np.asarray(csr.multiply(csr).sum(axis=1)).ravel())
+    else:
+        csr = None
+        v = np.nan_to_num(np.asarray(vecs, dtype="float32"), nan=0.0, posinf=0.0, neginf=0.0)
+        norms = np.linalg.norm(v, axis=1)
+    ok = np.isfinite(norms) & (norms > 0)
+    inv = np.zeros_like(norms)
+    inv[ok] = 1.0 / norms[ok]
+    if csr is not None:
+        return sp.diags(inv) @ csr
+    return v * inv[:, None]
+
+
+def safe_cosine_similarity(vecs) -> np.ndarray:
+    """
+    Cosine similarity of the rows of vecs as one row-normalized matrix product (float32).
+    NaN / inf entries are zeroed, zero rows get similarity 0 to everything, and the
+    diagonal is 0.
+    """
+    unit = _unit_rows(np.asarray(vecs))
+    sim = unit @ unit.T
+    np.fill_diagonal(sim, 0.0)
+    return np.nan_to_num(sim, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _dense_top_k(sim: np.ndarray, top_k: int) -> sp.csr_matrix:
+    k = min(top_k, sim.shape[1])
+    cols = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+    rows = np.repeat(np.arange(sim.shape[0]), k)
+    cols = cols.ravel()
+    return sp.csr_matrix((sim[rows, cols], (rows, cols)), shape=sim.shape)
+
+
+def _sparse_top_k(csr: sp.csr_matrix, top_k: int) -> sp.csr_matrix:
+    """Keep the top_k largest entries of every row (ties: lower column index first)."""
+    rows = np.repeat(np.arange(csr.shape[0]), np.diff(csr.indptr))
+    order = np.lexsort((-csr.data, rows))
+    rank = np.arange(len(order)) - csr.indptr[rows[order]]
+    keep = order[rank < top_k]
+    return sp.csr_matrix((csr.data[keep], (rows[keep], csr.indices[keep])), shape=csr.shape)
+
+
+def _sparsify_rows(sim, top_k: Optional[int], threshold: Optional[float]) -> sp.csr_matrix:
+    """Per-row top_k / threshold selection (not symmetrized); works on any block of rows."""
+    if top_k is not None and top_k > 0 and not sp.issparse(sim):
+        csr = _dense_top_k(np.asarray(sim), int(top_k))
+    elif threshold is not None and not sp.issparse(sim):
+        # mask before building the matrix: a CSR copy of the full dense block is several times its size
+        sim = np.asarray(sim)
+        rows, cols = np.nonzero(~(sim < threshold) & (sim != 0))
+        return sp.csr_matrix((sim[rows, cols], (rows, cols)), shape=sim.shape)
+    else:
+        csr = sp.csr_matrix(sim, copy=True)
+        if top_k is not None and top_k > 0:
+            csr = _sparse_top_k(csr, int(top_k))
+    if threshold is not None:
+        csr.data[csr.data < threshold] = 0.0
+    csr.eliminate_zeros()
+    return csr
+
+
+def sparsify_similarity(sim, top_k: Optional[int] = None, threshold: Optional[float] = None) -> sp.csr_matrix:
+    """
+    Sparse similarity graph from a dense or sparse similarity matrix (zero diagonal expected).
+    top_k keeps each row's k strongest edges, threshold drops edges below it; both can be combined.
+    The result is symmetrized (an edge kept from either endpoint is kept) since the graph is
+    undirected, and contains no explicit zeros.
+    """
+    csr = _sparsify_rows(sim, top_k, threshold)
+    return csr.maximum(csr.T).tocsr()
+
+
+def blocked_similarity_graph(vecs, top_k: Optional[int] = None, threshold: Optional[float] = None,
+                             max_bytes: int = 256 << 20) -> sp.csr_matrix:
+    """
+    Cosine similarity graph of the rows of vecs (dense or sparse), sparsified like
+    sparsify_similarity, without materializing the m x m matrix: similarities are computed
+    for as many rows at a time as fit in max_bytes, and each block is reduced to its top_k /
+    threshold edges before the next one. Needs top_k and/or threshold.
+    """
+    if not top_k and threshold is None:
+        raise ValueError("blocked_similarity_graph needs top_k and/or threshold")
+    unit = _unit_rows(vecs)
+    m = unit.shape[0]
+    # per entry: float32 similarities, their negated copy and argpartition's int64 indices
+    rows_per_block = max(1, int(max_bytes) // max(16 * m, 1))
+    parts = []
+    for start in range(0, m, rows_per_block):
+        stop = min(start + rows_per_block, m)
+        block = unit[start:stop] @ unit.T
+        if sp.issparse(block):
+            block = block.tocoo()
+            off = block.row + start != block.col
+            block = sp.csr_matrix((block.data[off].astype(np.float32), (block.row[off], block.col[off])),
+                                  shape=block.shape)
+        else:
+            block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        parts.append(_sparsify_rows(block, top_k, threshold))
+    csr = sp.vstack(parts, format="csr") if parts else sp.csr_matrix((0, 0), dtype=np.float32)
+    return csr.maximum(csr.T).tocsr()
+
+
+def degree_scores(vecs) -> np.ndarray:
+    """
+    Weighted degree of every sentence in the cosine similarity graph (row sums, zero diagonal),
+    in O(m * dim): sum_j cos(i, j) = u_i . sum_j u_j over unit rows u, minus the self term.
+    """
+    unit = _unit_rows(vecs)
+    total = np.asarray(unit.sum(axis=0)).ravel()
+    if sp.issparse(unit):
+        self_sim = np.asarray(unit.multiply(unit).sum(axis=1)).ravel()
+    else:
+        self_sim = np.einsum("ij,ij->i", unit, unit)
+    return np.asarray(unit @ total).ravel() - self_sim
+
+
+def _transition_matrix(weights):
+    """Row-normalize weights; returns (P^T for x @ P products, mask of dangling (zero-sum) rows)."""
+    if sp.issparse(weights):
+        w = sp.csr_matrix(weights, dtype=np.float64)
+        sums = np.asarray(w.sum(axis=1)).ravel()
+    else:
+        w = np.asarray(weights, dtype=np.float64)
+        sums = w.sum(axis=1)
+    nonzero = sums != 0
+    inv = np.zeros_like(sums)
+    inv[nonzero] = 1.0 / sums[nonzero]
+    if sp.issparse(w):
+        pt = w.multiply(inv[:, None]).T.tocsr()
+    else:
+        pt = np.ascontiguousarray((w * inv[:, None]).T)
+    return pt, ~nonzero
+
+
+def pagerank(weights, damping: float = 0.85, tol: float = 1.0e-6, max_iter: int = 100,
+             dangling: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    PageRank scores (summing to 1) of the graph whose edge i -> j has weight weights[i, j];
+    dense ndarray or scipy sparse input. Follows networkx.pagerank: uniform start and
+    teleport vectors, and the same l1 stopping rule (sum |x - x_prev| < m * tol).
+    Mass on dangling nodes (rows summing to zero) is redistributed with the dangling weights
+    (uniform when None). Raises PageRankConvergenceError after max_iter iterations.
+    """
+    m = weights.shape[0]
+    if m == 0:
+        return np.zeros(0)
+    pt, is_dangling = _transition_matrix(weights)
+    p = np.full(m, 1.0 / m)
+    if dangling is None:
+        dangling_weights = p
+    else:
+        dangling_weights = np.asarray(dangling, dtype=np.float64)
+        dangling_weights = dangling_weights / dangling_weights.sum()
+    x = p.copy()
+    for _ in range(max_iter):
+        xlast = x
+        x = damping * (pt @ xlast + xlast[is_dangling].sum() * dangling_weights) + (1.0 - damping) * p
+        if np.abs(x - xlast).sum() < m * tol:
+            return x
+    raise PageRankConvergenceError(f"PageRank did not converge in {max_iter} iterations")
+
+
+def pagerank_batch(weights_list: List, damping: float = 0.85, tol: float = 1.0e-6,
+                   max_iter: int = 100) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    PageRank for many independent graphs in one power iteration over their block-diagonal
+    sparse matrix. Every block gets its own uniform teleport / dangling distribution and its
+    own convergence test; a block stops updating once it converges, so its scores equal what
+    pagerank() returns for it alone. Returns (scores per graph, bool array of converged graphs);
+    non-converged graphs carry their last iterate.
+    """
+    sizes = np.array([w.shape[0] for w in weights_list], dtype=np.int64)
+    scores = [np.zeros(0) for _ in weights_list]
+    converged = np.ones(len(weights_list), dtype=bool)
+    live = np.flatnonzero(sizes > 0)
+    if len(live) == 0:
+        return scores, converged
+    live_sizes = sizes[live]
+    pt, is_dangling = _transition_matrix(sp.block_diag([weights_list[i] for i in live], format="csr"))
+    starts = np.concatenate(([0], np.cumsum(live_sizes)[:-1]))
+    block_of = np.repeat(np.arange(len(live)), live_sizes)
+    p = 1.0 / live_sizes[block_of]
+    x = p.copy()
+    active = np.ones(len(live), dtype=bool)
+    for _ in range(max_iter):
+        dangling_mass = np.add.reduceat(np.where(is_dangling, x, 0.0), starts)
+        x_new = damping * (pt @ x + dangling_mass[block_of] * p) + (1.0 - damping) * p
+        err = np.add.reduceat(np.abs(x_new - x), starts)
+        x = np.where(active[block_of], x_new, x)
+        active &= ~(err < live_sizes * tol)
+        if not active.any():
+            break
+    converged[live] = ~active
+    for i, block in zip(live, np.split(x, starts[1:])):
+        scores[i] = block
+    return scores, converged
+
+
+def top_n_indices(scores, n: int) -> np.ndarray:
+    """
+    Positions of the n highest scores, sorted ascending (document order), in O(m + n log n)
+    via np.argpartition. Ties at the cut-off go to the earlier sentence, as a stable
+    descending sort would; NaN scores rank last.
+    """
+    s = np.nan_to_num(np.asarray(scores, dtype=np.float64).ravel(), nan=-np.inf)
+    m = len(s)
+    n = min(max(int(n), 0), m)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if n == m:
+        return np.arange(m)
+    cut = s[np.argpartition(-s, n - 1)[:n]].min()
+    above = np.flatnonzero(s > cut)
+    ties = np.flatnonzero(s == cut)[: n - len(above)]
+    return np.sort(np.concatenate((above, ties)))
+
+
+def mmr_indices(scores, sim, n: int, lam: float = 0.7) -> np.ndarray:
+    """
+    Maximal Marginal Relevance: n positions (document order) picked one at a time, each
+    maximizing lam * relevance - (1 - lam) * (max similarity to the sentences already picked).
+    Relevance is scores / max(scores) so lam weighs it against cosine similarities on the
+    same 0..1 scale. sim is the (dense or sparse) sentence graph; only the picked rows are
+    read and the max-similarity vector is updated in place, so the cost is O(n * m).
+    Ties go to the earlier sentence.
+    """
+    rel = np.nan_to_num(np.asarray(scores, dtype=np.float64).ravel(), nan=0.0)
+    m = len(rel)
+    n = min(max(int(n), 0), m)
+    top = np.abs(rel).max() if m else 0.0
+    if top > 0:
+        rel = rel / top
+    sparse = sp.issparse(sim)
+    if sparse:
+        sim = sp.csr_matrix(sim)
+    max_sim = np.zeros(m)
+    picked = np.zeros(m, dtype=bool)
+    for _ in range(n):
+        gain = np.where(picked, -np.inf, lam * rel - (1.0 - lam) * max_sim)
+        i = int(np.argmax(gain))
+        picked[i] = True
+        row = sim[i].toarray().ravel() if sparse else np.asarray(sim[i], dtype=np.float64)
+        np.maximum(max_sim, row, out=max_sim)
+    return np.flatnonzero(picked)
+
+
+def budget_indices(scores, costs, budget: float) -> np.ndarray:
+    """
+    Greedy knapsack: positions (in document order) of sentences with total cost <= budget and a
+    high total score. Sentences are taken by score per unit cost, skipping any that no longer
+    fit; the result is replaced by the best single sentence when that scores higher, which
+    bounds it at >= 1/2 of the optimum. O(m log m) for the ordering plus one pass.
+    """
+    s = np.nan_to_num(np.asarray(scores, dtype=np.float64).ravel(), nan=0.0)
+    c = np.maximum(np.asarray(costs, dtype=np.float64).ravel(), 1e-9)
+    fits = np.flatnonzero(c <= budget)
+    if len(fits) == 0:
+        return np.zeros(0, dtype=np.int64)
+    order = fits[np.lexsort((fits, -(s[fits] / c[fits])))]
+    cheapest = c[fits].min()
+    chosen = []
+    left = float(budget)
+    for i in order:
+        if c[i] <= left:
+            chosen.append(i)
+            left -= c[i]
+            if left < cheapest:
+                break
+    chosen = np.array(chosen, dtype=np.int64)
+    best = fits[np.argmax(s[fits])]
+    if s[best] > s[chosen].sum():
+        chosen = np.array([best], dtype=np.int64)
+    return np.sort(chosen)
@@ -0,0 +1,133 @@
+"""
+backend/segmenter.py
+
+Rule-based sentence segmentation in one compiled-regex pass:
+- sentence_spans(text) -> list[(start, end)]   # character offsets of each sentence in text
+- split_sentences(text) -> list[str]           # the sentences themselves (text[start:end])
+
+A sentence ends at ., ! or ? (or a run of them, e.g. "?!" / "...") followed by closing quotes or
+brackets and then whitespace or the end of the text, and always at a blank line. A period does
+not end a sentence after a known abbreviation ("e.g.", "Dr."), a single-letter initial
+followed by another initial or a name ("J. R. R. Tolkien", "J. Smith"; not "I." or "Vitamin A.
+It ...") or a short token followed by a lowercase word ("wt. loss"), and ! / ? not before a
+lowercase word; decimals ("3.5") and dotted numbers never match since
+the period must be followed by whitespace. Abbreviations that often close a sentence ("etc.",
+"Inc.", "U.S.") end it only when the next word is capitalized.
+"""
+
+from typing import List, Tuple
+import re
+
+# abbreviations that are (almost) never sentence-final
+ABBREVIATIONS = frozenset(
+    """mr mrs ms dr prof st mt rev gen col capt lt sgt gov sen hon vs cf e.g i.e viz al approx
+    dept fig figs nos vol vols pp eq incl esp resp excl min max hr hrs wk wks yr yrs mo mos
+    tbsp tsp oz lb lbs""".split()
+)
+# abbreviations (and units) that also commonly end a sentence: a boundary only before a capitalized word
+SENTENCE_FINAL_ABBREVIATIONS = frozenset(
+    """etc inc ltd co corp llc bros jr sr a.m p.m u.s u.k u.s.a ph.d no est ref sec ch p v
+    mg mcg ml kg km cm mm ft tab tabs cap caps inj ave blvd rd
+    jan feb mar apr jun jul aug sep sept oct nov dec""".split()
+)
+# capitalized words that commonly open a sentence: after a single capital letter and a period
+# ("Vitamin A. It helps.") they mark a boundary, where a name ("J. Smith") would not
+SENTENCE_STARTERS = frozenset(
+    """a an the this that these those there here it its he she we they i you his her their our my
+    your in on at for with by from to of as after before when while if but and or so then however
+    also what why how who where which all some many most each every no not one both such other
+    since because although though during yet now thus therefore""".split()
+)
+
+_OPENERS = "\"'([{“‘"
+# first character of the next word, skipping whitespace and opening quotes / brackets
+_NEXT_CHAR = re.compile(r"\s*[\"'(\[{“‘]*(.?)", re.S)
+_NEXT_WORD = re.compile(r"\s*[\"'(\[{“‘]*(\S*)")
+_INITIAL = re.compile(r"[A-Z]\.")
+_NON_SPACE = re.compile(r"\S")
+
+# one pass over the text: blank lines, or terminal punctuation (plus closing quotes / brackets)
+# followed by whitespace or the end of the text
+_BOUNDARY = re.compile(
+    r"(?P<para>\n[ \t]*\n\s*)"
+    r"|(?P<punct>[.!?…]+)[\"'”’)\]}]*(?=\s|$)"
+)
+
+
+def _token_before(text: str, i: int, window: int = 32) -> str:
+    """The word carrying the punctuation at text[i], looking back at most window characters
+    (longer tokens are never abbreviations)."""
+    chunk = text[max(i - window, 0):i]
+    if not chunk or chunk[-1].isspace():
+        return ""
+    return chunk.rsplit(None, 1)[-1]
+
+
+def _ends_sentence(text: str, m: "re.Match") -> bool:
+    punct = m.group("punct")
+    nxt = _NEXT_CHAR.match(text, m.end()).group(1)
+    if punct[-1] not in ".…":
+        return not nxt.islower()
+    if len(punct) > 1 or punct == "…":
+        # ellipsis: only before a capitalized word
+        return not nxt or nxt.isupper()
+    token = _token_before(text, m.start()).lstrip(_OPENERS)
+    word = token.lower()
+    if word in ABBREVIATIONS:
+        return False
+    if len(token) == 1 and token.isupper():
+        # initials ("J. R. R. Tolkien"), unless followed by an ordinary sentence opener; the
+        # pronoun "I." only before another initial ("I. M. Pei")
+        if not nxt.isupper():
+            return not nxt
+        return not _followed_by_name(text, m.end(), initials_only=token == "I")
+    if word in SENTENCE_FINAL_ABBREVIATIONS or ("." in word and word.replace(".", "").isalpha()):
+        return not nxt or nxt.isupper()
+    if nxt.islower():
+        # a lowercase continuation after a short or unknown abbreviation-like token ("approx. two",
+        # "wt. loss"); after an ordinary word it is a sloppily-cased new sentence
+        return len(word) > 3 and word.isalpha()
+    return True
+
+
+def _followed_by_name(text: str, pos: int, initials_only: bool = False) -> bool:
+    """True when the word at pos is another initial ("R.") or, unless initials_only, looks like
+    a name (capitalized, alphabetic and not a common sentence opener)."""
+    word = _NEXT_WORD.match(text, pos).group(1)
+    if _INITIAL.match(word):
+        return True
+    if initials_only:
+        return False
+    word = word.rstrip(".,;:!?\"')]}”’")
+    return word.isalpha() and word.lower() not in SENTENCE_STARTERS
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) character offsets of the sentences in text, without surrounding whitespace."""
+    spans = []
+    start = 0
+    for m in _BOUNDARY.finditer(text):
+        if m.group("para") is not None:
+            end = m.start()
+        elif _ends_sentence(text, m):
+            end = m.end()
+        else:
+            continue
+        _add_span(spans, text, start, end)
+        start = m.end()
+    _add_span(spans, text, start, len(text))
+    return spans
+
+
+def _add_span(spans: List[Tuple[int, int]], text: str, start: int, end: int) -> None:
+    first = _NON_SPACE.search(text, start, end)
+    if first is None:
+        return
+    while text[end - 1].isspace():
+        end -= 1
+    spans.append((first.start(), end))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of text (see sentence_spans)."""
+    return [text[s:e] for s, e in sentence_spans(text)]
@@ -2,75 +2,332 @@
 backend/summarizer.py
 
 Robust extractive summarizer:
-- summary_text(text, n=5) -> str   # summarize arbitrary text
+- summary_text(text, n=5, max_chars=None, max_tokens=None, selection=None) -> str   # summarize arbitrary text
+  # max_chars / max_tokens: pick sentences under a length budget instead of a fixed count
+  # selection: "top" or "mmr" (redundancy-aware); defaults to SELECTION_MODE
 - summarize_dataset(excel_path='TASK.xlsx', text_col=None, n=5, save_csv=True) -> list[dict]
   # summarize rows in Excel/CSV; writes SummaryFile.csv next to dataset when save_csv=True
+- summarize_texts(texts, n=5, max_chars=None, max_tokens=None, selection=None) -> list[str]   # batched summary_text for many texts
 
 Features:
-- optional GloVe (place glove.6B.100d.txt in backend/)
-- TF-IDF fallback if GloVe missing
-- Safe NLTK usage (tries to use nltk.sent_tokenize & stopwords; falls back to simple split)
+- optional GloVe (place glove.6B.100d.txt, .txt.gz or glove.6B.zip in backend/; GLOVE_DIM picks 50/100/200/300);
+  parsed once into a binary cache (see embeddings.py)
+- TF-IDF fallback if GloVe missing (or fit-free feature hashing, LEXICAL_BACKEND=hashing)
+- Safe NLTK usage (punkt & stopwords read offline from NLTK_DATA_DIR; falls back to the rule-based
+  splitter in segmenter.py), set up on first use
+- sklearn / pandas / nltk are imported lazily, on the code paths that need them
 - Good error handling
 """
 
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 import os
 import re
+import pickle
 import logging
+import threading
 import numpy as np
-import pandas as pd
+import scipy.sparse as sp
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import networkx as nx
+from embeddings import EmbeddingTable, corpus_vocab, open_embedding_table
+from ranking import (blocked_similarity_graph, degree_scores, pagerank, pagerank_batch, safe_cosine_similarity,
+                     sparsify_similarity, budget_indices, mmr_indices, top_n_indices)
+from interning import TokenInterner
+from segmenter import split_sentences
+
+# sklearn, pandas and nltk are imported inside the functions that use them, so importing this
+# module (and starting the API) does not pay for them; the first request on each path does.
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 
 _LOG = logging.getLogger(__name__)
 
-# Paths to look for glove file (you can place glove.6B.100d.txt inside backend/).
-_GLOVE_PATHS = [
-    os.path.join(os.path.dirname(__file__), "glove.6B.100d.txt"),
-    os.path.join(os.path.dirname(__file__), "..", "glove.6B.100d.txt"),
-]
+# GloVe dimension (50/100/200/300): selects glove.6B.<dim>d.* files and the matching
+# member of glove.6B.zip. EMBEDDINGS_PATH points at any other embedding file instead
+# (.txt/.vec/.bin, optionally .gz/.bz2/.zip; EMBEDDINGS_MEMBER picks the file inside a zip).
+GLOVE_DIM = int(os.environ.get("GLOVE_DIM", "100"))
+EMBEDDINGS_PATH = os.environ.get("EMBEDDINGS_PATH")
+EMBEDDINGS_MEMBER = os.environ.get("EMBEDDINGS_MEMBER")
+
+
+def _glove_candidates(dim: int) -> List[str]:
+    """Paths to look for embeddings (you can place glove.6B.<dim>d.txt or glove.6B.zip inside backend/)."""
+    names = [f"glove.6B.{dim}d.txt", f"glove.6B.{dim}d.txt.gz", f"glove.6B.{dim}d.txt.bz2", "glove.6B.zip"]
+    dirs = [os.path.dirname(__file__), os.path.join(os.path.dirname(__file__), "..")]
+    paths = [EMBEDDINGS_PATH] if EMBEDDINGS_PATH else []
+    return paths + [os.path.join(d, n) for d in dirs for n in names]
+
+
+def _archive_member(path: str) -> Optional[str]:
+    if not path.lower().endswith(".zip"):
+        return None
+    if os.path.basename(path).startswith("glove.6B"):
+        return f"glove.6B.{GLOVE_DIM}d.txt"
+    return EMBEDDINGS_MEMBER
+
+
+_GLOVE_PATHS = _glove_candidates(GLOVE_DIM)
+
+# Vocabulary-restricted loading: keep only GloVe rows for words seen in these corpora
+# (GLOVE_VOCAB_CORPUS, os.pathsep-separated .xlsx/.xls/.csv/.txt paths) and/or the
+# GLOVE_VOCAB_TOP_K most frequent words. Other words are treated as OOV (zero vectors).
+GLOVE_VOCAB_CORPUS = [p for p in os.environ.get("GLOVE_VOCAB_CORPUS", "").split(os.pathsep) if p]
+GLOVE_VOCAB_TOP_K = int(os.environ["GLOVE_VOCAB_TOP_K"]) if os.environ.get("GLOVE_VOCAB_TOP_K") else None
+# Embedding matrix storage: "float32" (default), "float16" or "int8" (per-row scale).
+GLOVE_STORAGE = os.environ.get("GLOVE_STORAGE", "float32")
+
+# TF-IDF fallback mode:
+# - "corpus" (default): transform with one vectorizer fit over a corpus. It is loaded from
+#   TFIDF_VECTORIZER_PATH, else fit from TFIDF_CORPUS files (same format as GLOVE_VOCAB_CORPUS);
+#   fit_corpus_tfidf() / summarize_dataset(refit_tfidf=True) fit one explicitly and persist it to
+#   TFIDF_VECTORIZER_PATH. Request data (uploads, summarized datasets) never fits it implicitly.
+#   Until one exists, and for documents with fewer than TFIDF_MIN_COVERAGE of their terms in its
+#   vocabulary (off-domain text), documents fall back to the per-document fit.
+# - "document": fit a new vectorizer on each document's sentences.
+TFIDF_MODE = os.environ.get("TFIDF_MODE", "corpus")
+TFIDF_VECTORIZER_PATH = os.environ.get("TFIDF_VECTORIZER_PATH", os.path.join(os.path.dirname(__file__), "tfidf_vectorizer.pkl"))
+TFIDF_CORPUS = [p for p in os.environ.get("TFIDF_CORPUS", "").split(os.pathsep) if p]
+TFIDF_MIN_COVERAGE = float(os.environ.get("TFIDF_MIN_COVERAGE", "0.5"))
+
+# Lexical backend used when GloVe is unavailable: "tfidf" (above) or "hashing". The hashing
+# backend needs no fitting and a fixed 2**HASHING_BITS-column space; vectors are weighted by
+# the IDF table at HASHING_IDF_PATH when one was built offline with fit_hashing_idf().
+LEXICAL_BACKEND = os.environ.get("LEXICAL_BACKEND", "tfidf")
+HASHING_BITS = int(os.environ.get("HASHING_BITS", "18"))
+HASHING_IDF_PATH = os.environ.get("HASHING_IDF_PATH", os.path.join(os.path.dirname(__file__), "hashing_idf.npy"))
+
+# Similarity graph: keep only each sentence's GRAPH_TOP_K strongest edges and/or edges with
+# similarity >= GRAPH_THRESHOLD (sparse graph); unset keeps the full m x m graph.
+GRAPH_TOP_K = int(os.environ["GRAPH_TOP_K"]) if os.environ.get("GRAPH_TOP_K") else None
+GRAPH_THRESHOLD = float(os.environ["GRAPH_THRESHOLD"]) if os.environ.get("GRAPH_THRESHOLD") else None
+
+# Memory cap (MB) for the similarity step of one document. When the full m x m matrix would
+# exceed it, similarities are computed in row blocks straight into the top-k / threshold graph,
+# or, with neither set, sentences are ranked by similarity degree without building any matrix.
+SIMILARITY_MEMORY_MB = float(os.environ.get("SIMILARITY_MEMORY_MB", "512"))
+
+# summarize_texts: similarity graphs of up to BATCH_GRAPH_MAX_EDGES entries (a 256-sentence dense
+# graph) are stacked into block-diagonal PageRank solves of at most BATCH_EDGES entries (the
+# stacked COO / CSR copies cost ~40 bytes per entry); larger graphs are ranked one at a time
+# like summary_text does. GloVe vectors are built for at most BATCH_SENTENCES sentences per call.
+BATCH_GRAPH_MAX_EDGES = int(os.environ.get("BATCH_GRAPH_MAX_EDGES", str(1 << 16)))
+BATCH_EDGES = int(os.environ.get("BATCH_EDGES", str(1 << 21)))
+BATCH_SENTENCES = int(os.environ.get("BATCH_SENTENCES", str(1 << 16)))
+
+# PageRank parameters (defaults match networkx.pagerank)
+PAGERANK_DAMPING = float(os.environ.get("PAGERANK_DAMPING", "0.85"))
+PAGERANK_TOL = float(os.environ.get("PAGERANK_TOL", "1e-6"))
+PAGERANK_MAX_ITER = int(os.environ.get("PAGERANK_MAX_ITER", "100"))
+
+# Sentence selection for count-based summaries: "top" (n best PageRank scores) or "mmr"
+# (Maximal Marginal Relevance over the similarity graph, fewer near-duplicate sentences;
+# MMR_LAMBDA = 1 is plain top-n, lower values penalize redundancy more)
+SELECTION_MODE = os.environ.get("SELECTION_MODE", "top")
+MMR_LAMBDA = float(os.environ.get("MMR_LAMBDA", "0.7"))
+
+# NLTK data (punkt sentence model, stopword list) is read from NLTK_DATA_DIR only and never
+# downloaded at runtime. The English stopword list ships in backend/nltk_data; backend/build.sh
+# adds the punkt model (python -m nltk.downloader -d backend/nltk_data punkt_tab punkt)
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA_DIR", os.path.join(os.path.dirname(__file__), "nltk_data"))
+
+# Sentence splitter: "auto" (punkt when its model is in NLTK_DATA_DIR, else the built-in rules),
+# "punkt" or "rules" (segmenter.py: one regex pass, abbreviation-aware, no model files)
+SENTENCE_SPLITTER = os.environ.get("SENTENCE_SPLITTER", "auto")
+
+# Size of the LRU mapping raw token surface forms ("Tablet", "TABLET") to interned ids
+# (see interning.py). The id table keeps every distinct lower-cased token seen; once it holds
+# more than TOKEN_TABLE_SIZE tokens the next document / batch starts a fresh interner, so
+# request text (numbers, typos, ...) cannot grow it without limit.
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", str(1 << 18)))
+TOKEN_TABLE_SIZE = int(os.environ.get("TOKEN_TABLE_SIZE", str(1 << 19)))
 
 _glove = None
-_glove_dim = 100
+_glove_dim = GLOVE_DIM
+
+_tfidf_lock = threading.Lock()
+_corpus_tfidf = None
+_corpus_tfidf_tried = False
+
+_hashing = None
+_hashing_idf = None
+_hashing_idf_tried = False
+
+# GloVe loading state, readable from other threads via glove_status().
+# state: "idle" | "loading" | "ready" | "missing" | "failed"
+_glove_lock = threading.Lock()
+_glove_status = {"state": "idle", "progress": 0.0, "error": None}
+_warmup_thread = None
 
 
-def _load_glove() -> Optional[dict]:
-    """Load GloVe vectors if present; return dict(word -> np.array) or None."""
+def _set_glove_progress(fraction: float) -> None:
+    _glove_status["progress"] = round(min(max(fraction, 0.0), 1.0), 3)
+
+
+def _load_glove() -> Optional[EmbeddingTable]:
+    """Load GloVe vectors if present; return an EmbeddingTable (memory-mapped matrix) or None."""
     global _glove, _glove_dim
     if _glove is not None:
         return _glove
-    chosen = None
-    for p in _GLOVE_PATHS:
-        if os.path.exists(p) and os.path.getsize(p) > 0:
-            chosen = p
-            break
-    if not chosen:
-        _LOG.info("GloVe file not found in backend. Using TF-IDF fallback.")
-        _glove = None
+    with _glove_lock:
+        if _glove is not None:
+            return _glove
+        chosen = None
+        for p in _GLOVE_PATHS:
+            if os.path.exists(p) and os.path.getsize(p) > 0:
+                chosen = p
+                break
+        if not chosen:
+            _LOG.info("GloVe file not found in backend. Using TF-IDF fallback.")
+            _glove_status.update(state="missing", progress=0.0)
+            _glove = None
+            return None
+        _LOG.info("Loading GloVe from %s ...", chosen)
+        _glove_status.update(state="loading", progress=0.0, error=None)
+        try:
+            keep = _corpus_vocab_from_files(GLOVE_VOCAB_CORPUS) if GLOVE_VOCAB_CORPUS else None
+            table = open_embedding_table(chosen, progress=_set_glove_progress, keep=keep, top_k=GLOVE_VOCAB_TOP_K,
+                                         storage=GLOVE_STORAGE, member=_archive_member(chosen))
+        except Exception as e:
+            _glove_status.update(state="failed", error=str(e))
+            raise
+        if table is None:
+            _LOG.warning("GloVe file was found but no embeddings loaded.")
+            _glove_status.update(state="failed", error="no embeddings loaded")
+            _glove = None
+            return None
+        _glove_dim = table.dim
+        _glove = table
+        _glove_status.update(state="ready", progress=1.0)
+        _LOG.info("GloVe loaded: vocab=%d dim=%d", len(table), _glove_dim)
+        return _glove
+
+
+def _read_corpus_texts(paths: List[str]) -> Optional[List[str]]:
+    """Texts of the given dataset (.xlsx/.xls/.csv) / .txt files; None if none of them could be read."""
+    texts = []
+    read_any = False
+    for p in paths:
+        try:
+            if os.path.splitext(p)[1].lower() == ".txt":
+                with open(p, "r", encoding="utf-8", errors="ignore") as fh:
+                    texts.append(fh.read())
+            else:
+                texts.extend(_read_dataset_texts(p))
+            read_any = True
+        except Exception as e:
+            _LOG.warning("Could not read corpus %s: %s", p, e)
+    return texts if read_any else None
+
+
+def _corpus_vocab_from_files(paths: List[str]) -> Optional[set]:
+    """Vocabulary of the given dataset / text files; None if none of them could be read."""
+    texts = _read_corpus_texts(paths)
+    return corpus_vocab(texts, _VECTOR_TOKEN) if texts is not None else None
+
+
+def _warmup_glove() -> None:
+    try:
+        _load_glove()
+    except Exception:
+        _LOG.exception("Background GloVe load failed; TF-IDF will be used.")
+
+
+def start_glove_warmup() -> None:
+    """Start loading GloVe in a background daemon thread (no-op if already started or loaded)."""
+    global _warmup_thread
+    if _glove is not None or _warmup_thread is not None:
+        return
+    _warmup_thread = threading.Thread(target=_warmup_glove, name="glove-warmup", daemon=True)
+    _warmup_thread.start()
+
+
+def _reset_glove_after_fork() -> None:
+    """
+    In a forked child (e.g. gunicorn --preload) the warm-up thread is gone and may have left
+    _glove_lock held: give the child a fresh lock and, if a warm-up was under way, restart it.
+    """
+    global _glove_lock, _warmup_thread
+    _glove_lock = threading.Lock()
+    if _glove_status["state"] == "loading":
+        _glove_status.update(state="idle", progress=0.0)
+    restart = _warmup_thread is not None and _glove is None and _glove_status["state"] == "idle"
+    _warmup_thread = None
+    if restart:
+        start_glove_warmup()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_glove_after_fork)
+
+
+def glove_status() -> Dict:
+    """Snapshot of the GloVe loading state: {"state", "progress", "error", "ready"}."""
+    st = dict(_glove_status)
+    st["ready"] = st["state"] in ("ready", "missing", "failed")
+    return st
+
+
+def _glove_if_ready() -> Optional[EmbeddingTable]:
+    """
+    GloVe table for a request. While a background warm-up is still running return None
+    (callers use TF-IDF) instead of blocking; without a warm-up thread, load synchronously.
+    A "missing" or "failed" load is final here: requests use TF-IDF and only an explicit
+    _load_glove() call tries again.
+    """
+    if _glove is not None:
+        return _glove
+    if _glove_status["state"] in ("missing", "failed"):
         return None
-    _LOG.info("Loading GloVe from %s ... (this may take a minute)", chosen)
-    emb = {}
-    with open(chosen, "r", encoding="utf-8", errors="ignore") as fh:
-        for line in fh:
-            parts = line.strip().split()
-            if len(parts) <= 2:
-                continue
-            w = parts[0]
-            vec = np.asarray(parts[1:], dtype="float32")
-            emb[w] = vec
-    if not emb:
-        _LOG.warning("GloVe file was found but no embeddings loaded.")
-        _glove = None
+    if _warmup_thread is not None and _warmup_thread.is_alive():
+        return None
+    try:
+        return _load_glove()
+    except Exception:
+        _LOG.exception("GloVe load failed; TF-IDF will be used.")
         return None
-    _glove_dim = len(next(iter(emb.values())))
-    _glove = emb
-    _LOG.info("GloVe loaded: vocab=%d dim=%d", len(emb), _glove_dim)
-    return _glove
 
 
 # --- Tokenization & stopwords (use nltk if available, but safe fallback) ---
+_tokenizer = None
+_interner = None
+_tokenizer_lock = threading.Lock()
+
+
+def _read_stopwords(data_dir: str) -> Optional[set]:
+    """English stopwords from an nltk_data directory (corpora/stopwords/english), or None."""
+    path = os.path.join(data_dir, "corpora", "stopwords", "english")
+    try:
+        with open(path, encoding="utf-8") as fh:
+            words = {line.strip() for line in fh if line.strip()}
+    except OSError:
+        return None
+    return words or None
+
+
+def _punkt_tokenizer(data_dir: str):
+    """nltk punkt sentence tokenizer loaded from the files in data_dir, or None when they are not there.
+    Files are opened by path (data_dir is registered on nltk.data.path, which nltk requires for
+    reading); there is no search of other nltk_data locations and no download."""
+    tab_dir = os.path.join(data_dir, "tokenizers", "punkt_tab", "english")
+    pickled = os.path.join(data_dir, "tokenizers", "punkt", "english.pickle")
+    if not (os.path.isdir(tab_dir) or os.path.isfile(pickled)):
+        return None
+    try:
+        import nltk
+
+        if data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, data_dir)
+        if os.path.isdir(tab_dir):
+            # nltk >= 3.8.2: plain-text parameter files
+            from nltk.tokenize.punkt import PunktSentenceTokenizer, load_punkt_params
+
+            params = load_punkt_params(nltk.data.FileSystemPathPointer(tab_dir))
+            return PunktSentenceTokenizer(params)
+        return nltk.data.load("file:" + pickled)
+    except Exception as e:
+        _LOG.warning("Could not load punkt from %s: %s", data_dir, e)
+    return None
+
+
 def _get_sentence_tokenizer_and_stopset():
     fallback_stop = set(
         """a an the and or if in on at for to of is are was were be been it this that
@@ -78,89 +335,324 @@ def _get_sentence_tokenizer_and_stopset():
         my your so what which who whom""".split()
     )
 
-    try:
-        import nltk
-        from nltk.tokenize import sent_tokenize
+    stopset = _read_stopwords(NLTK_DATA_DIR)
+    if stopset is None:
+        _LOG.warning("No stopword list in %s; using the built-in short list", NLTK_DATA_DIR)
+        stopset = fallback_stop
 
-        # ensure punkt & stopwords exist - download only if missing
-        try:
-            nltk.data.find("tokenizers/punkt")
-        except LookupError:
-            _LOG.info("Downloading NLTK punkt tokenizer (one-time) ...")
-            nltk.download("punkt")
-        # stopwords
-        try:
-            nltk.data.find("corpora/stopwords")
-            from nltk.corpus import stopwords
+    if SENTENCE_SPLITTER != "rules":
+        punkt = _punkt_tokenizer(NLTK_DATA_DIR)
+        if punkt is not None:
+            return punkt.tokenize, stopset
+        # with "auto" the rules are the intended fallback; an explicit "punkt" without a model is not
+        log = _LOG.warning if SENTENCE_SPLITTER == "punkt" else _LOG.info
+        log("No punkt model in %s; using the rule-based sentence splitter (build.sh bundles it)", NLTK_DATA_DIR)
 
-            stopset = set(stopwords.words("english"))
-        except LookupError:
-            _LOG.info("Downloading NLTK stopwords (one-time) ...")
-            nltk.download("stopwords")
-            from nltk.corpus import stopwords
+    return split_sentences, stopset
 
-            stopset = set(stopwords.words("english"))
-        except Exception:
-            stopset = fallback_stop
 
-        return sent_tokenize, stopset
-    except Exception:
-        # fallback simple sentence splitter
-        def _simple_sent_tokenize(text: str) -> List[str]:
-            pieces = re.split(r"(?<=[.!?])\s+", text.strip())
-            return [p.strip() for p in pieces if p.strip()]
+def _tokenizer_and_stopset():
+    """(sentence tokenizer, stopword set), set up on first use rather than at import."""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = _get_sentence_tokenizer_and_stopset()
+    return _tokenizer
 
-        return _simple_sent_tokenize, fallback_stop
 
+def _sent_tokenize(text: str) -> List[str]:
+    return _tokenizer_and_stopset()[0](text)
 
-_sent_tokenize, _stopwords = _get_sentence_tokenizer_and_stopset()
 
+def _get_interner() -> TokenInterner:
+    """
+    Token interner for one unit of work (a document, a summarize_texts batch, a fit): ids are
+    only meaningful with the interner that made them, so callers take it once and pass it on.
+    Made on first use (stopword flags from the active stopword list) and replaced by a fresh one
+    once it holds more than TOKEN_TABLE_SIZE tokens; work still holding the old one is unaffected.
+    """
+    global _interner
+    if _interner is None or len(_interner) > TOKEN_TABLE_SIZE:
+        stopset = _tokenizer_and_stopset()[1]
+        with _tokenizer_lock:
+            if _interner is None or len(_interner) > TOKEN_TABLE_SIZE:
+                if _interner is not None:
+                    _LOG.info("Token table reached %d tokens; starting a new one", len(_interner))
+                # the sentence separator is flagged like a stopword so one mask drops both;
+                # interned first, so its id is _SENTENCE_BREAK_ID
+                interner = TokenInterner(set(stopset) | {_SENTENCE_BREAK}, surface_cache=TOKEN_CACHE_SIZE)
+                interner.ids([_SENTENCE_BREAK])
+                _interner = interner
+    return _interner
+
+
+# --- Normalization: one pass per text into interned token ids, shared by every vector backend ---
+# runs of ASCII letters / digits; everything else separates tokens
+_VECTOR_TOKEN = re.compile(r"[a-zA-Z0-9]+")
+# sentences are tokenized in one regex pass over their "\0"-joined text; the separator is a token
+_SENTENCE_BREAK = "\0"
+_SENTENCE_BREAK_ID = 0
+_VECTOR_TOKEN_OR_BREAK = re.compile(r"[a-zA-Z0-9]+|\0")
+
+
+def _normalize_sentences(sentences: List[str], interner: TokenInterner) -> List[np.ndarray]:
+    """Interned ids (int32) of the lower-cased alphanumeric tokens of each sentence minus stopwords:
+    the only tokenization of a sentence. A text's tokens become ids in one pass and the stopword
+    test is one boolean index over all of them; GloVe gathers rows by id and the lexical backends
+    get the tokens back space-joined (_token_texts)."""
+    if not sentences:
+        return []
+    joined = _SENTENCE_BREAK.join(sentences)
+    if joined.count(_SENTENCE_BREAK) != len(sentences) - 1:
+        # a stray "\0" in the text is a token separator like any other non-alphanumeric
+        joined = _SENTENCE_BREAK.join(s.replace(_SENTENCE_BREAK, " ") for s in sentences)
+    ids = interner.ids(_VECTOR_TOKEN_OR_BREAK.findall(joined))
+    keep = ~interner.is_stop[ids]
+    kept = ids[keep]
+    # number of kept tokens before each sentence break
+    cuts = [0] + np.cumsum(keep)[ids == _SENTENCE_BREAK_ID].tolist() + [len(kept)]
+    return [kept[a:b] for a, b in zip(cuts[:-1], cuts[1:])]
+
+
+def _token_texts(sent_tokens: List[np.ndarray], interner: TokenInterner) -> List[str]:
+    """Normalized sentences as text, for the sklearn (TF-IDF / hashing) vectorizers."""
+    return interner.texts(sent_tokens)
+
+
+def _sentence_vectors_with_glove_batch(docs: List[List[np.ndarray]], glove_embeddings: EmbeddingTable,
+                                       dim: int, interner: TokenInterner) -> List[np.ndarray]:
+    """
+    Averaged glove vectors for many documents (each a list of normalized sentence token id arrays)
+    at once; returns one (n_sentences, dim) array per doc. All tokens of all sentences are mapped
+    to embedding rows and gathered in one pass, then summed per sentence with np.add.reduceat, so
+    the numpy call count does not grow with the number of sentences.
+    """
+    if not docs:
+        return []
+    sent_tokens = [toks for doc in docs for toks in doc]
+    counts = np.fromiter((len(t) for t in sent_tokens), dtype=np.int64, count=len(sent_tokens))
+    out = np.zeros((len(sent_tokens), dim), dtype="float32")
+    nonempty = counts > 0
+    if nonempty.any():
+        flat = np.concatenate(sent_tokens)
+        # OOV words gather as zero rows, so they still count towards the average
+        rows = glove_embeddings.gather(interner.embedding_rows(glove_embeddings)[flat])
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        # empty sentences are skipped: consecutive non-empty starts delimit exactly one sentence each
+        sums = np.add.reduceat(rows, starts, axis=0)
+        out[nonempty] = sums / (counts[nonempty, None] + 1e-9)
+    bounds = np.cumsum([len(doc) for doc in docs])[:-1]
+    return np.split(out, bounds)
+
+
+def _sentence_vectors_with_glove(sent_tokens: List[np.ndarray], glove_embeddings: EmbeddingTable, dim: int,
+                                 interner: TokenInterner):
+    """Return numpy array shape (n_sentences, dim) using averaged glove vectors per sentence."""
+    return _sentence_vectors_with_glove_batch([sent_tokens], glove_embeddings, dim, interner)[0]
 
-# --- helper utilities ---
-def _clean_sentence_for_vectors(s: str) -> str:
-    # remove non-word characters but keep spaces and numbers
-    s = re.sub(r"[^a-zA-Z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s.lower()
 
+def _new_tfidf_vectorizer() -> "TfidfVectorizer":
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
-def _remove_stopwords_from_tokens(tokens: List[str]) -> str:
-    return " ".join([t for t in tokens if t.lower() not in _stopwords])
+    return TfidfVectorizer(stop_words="english", max_df=0.85)
 
 
-def _sentence_vectors_with_glove(clean_sentences: List[str], glove_embeddings: dict, dim: int):
-    """Return numpy array shape (n_sentences, dim) using averaged glove vectors per sentence."""
-    z = np.zeros((dim,), dtype="float32")
-    vecs = []
+def fit_corpus_tfidf(texts: List[str], save: bool = True) -> "TfidfVectorizer":
+    """
+    Fit the corpus-level TF-IDF vectorizer over the sentences of texts (prepared exactly like
+    summary_text prepares them), make it the active one and optionally persist it.
+    """
+    global _corpus_tfidf
+    tfidf = _fit_tfidf(texts, save=save)
+    with _tfidf_lock:
+        _corpus_tfidf = tfidf
+    return tfidf
+
+
+def _fit_tfidf(texts: List[str], save: bool = True) -> "TfidfVectorizer":
+    """fit_corpus_tfidf without activating the result; raises ValueError if texts have no terms."""
+    interner = _get_interner()
+    sent_tokens = [toks for t in texts for toks in _prepare_sentences(t, interner)[1] if len(toks)]
+    sents = _token_texts(sent_tokens, interner)
+    tfidf = _new_tfidf_vectorizer()
+    tfidf.fit(sents)
+    _LOG.info("Fitted corpus TF-IDF vectorizer: %d sentences, vocab=%d", len(sents), len(tfidf.vocabulary_))
+    if save and TFIDF_VECTORIZER_PATH:
+        try:
+            tmp = TFIDF_VECTORIZER_PATH + ".tmp%d" % os.getpid()
+            with open(tmp, "wb") as fh:
+                pickle.dump(tfidf, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, TFIDF_VECTORIZER_PATH)
+            _LOG.info("Saved corpus TF-IDF vectorizer to %s", TFIDF_VECTORIZER_PATH)
+        except OSError as e:
+            _LOG.warning("Could not save TF-IDF vectorizer to %s: %s", TFIDF_VECTORIZER_PATH, e)
+    return tfidf
+
+
+def _get_corpus_tfidf() -> Optional["TfidfVectorizer"]:
+    """Active corpus vectorizer: in memory, else persisted, else fit from TFIDF_CORPUS; None if none."""
+    global _corpus_tfidf, _corpus_tfidf_tried
+    if _corpus_tfidf is not None or _corpus_tfidf_tried:
+        return _corpus_tfidf
+    with _tfidf_lock:
+        if _corpus_tfidf is not None or _corpus_tfidf_tried:
+            return _corpus_tfidf
+        _corpus_tfidf_tried = True
+        if TFIDF_VECTORIZER_PATH and os.path.exists(TFIDF_VECTORIZER_PATH):
+            try:
+                with open(TFIDF_VECTORIZER_PATH, "rb") as fh:
+                    _corpus_tfidf = pickle.load(fh)
+                _LOG.info("Loaded corpus TF-IDF vectorizer from %s", TFIDF_VECTORIZER_PATH)
+                return _corpus_tfidf
+            except Exception as e:
+                _LOG.warning("Could not load TF-IDF vectorizer from %s: %s", TFIDF_VECTORIZER_PATH, e)
+        # fit under the lock so concurrent first requests fit (and write the pickle) only once
+        if TFIDF_CORPUS:
+            texts = _read_corpus_texts(TFIDF_CORPUS)
+            if texts:
+                try:
+                    _corpus_tfidf = _fit_tfidf(texts)
+                except ValueError as e:
+                    _LOG.warning("Could not fit corpus TF-IDF on %s: %s", TFIDF_CORPUS, e)
+        return _corpus_tfidf
+
+
+def _vocab_coverage(tfidf: "TfidfVectorizer", clean_sentences: List[str]) -> float:
+    """Fraction of the (analyzed) terms of clean_sentences in tfidf's vocabulary; 1.0 with no terms."""
+    analyze = tfidf.build_analyzer()
+    vocab = tfidf.vocabulary_
+    total = hits = 0
     for s in clean_sentences:
-        if s and s.strip():
-            words = [w for w in re.findall(r"\w+", s.lower()) if w not in _stopwords]
-            if words:
-                vs = [glove_embeddings.get(w, np.zeros((dim,), dtype="float32")) for w in words]
-                avg = np.sum(vs, axis=0) / (len(vs) + 1e-9)
-            else:
-                avg = z.copy()
-        else:
-            avg = z.copy()
-        vecs.append(avg)
-    return np.vstack(vecs) if vecs else np.zeros((0, dim), dtype="float32")
+        terms = analyze(s)
+        total += len(terms)
+        hits += sum(t in vocab for t in terms)
+    return hits / total if total else 1.0
 
 
-def _sentence_vectors_with_tfidf(clean_sentences: List[str]):
-    """Return dense TF-IDF vectors (numpy array)."""
+def _sentence_vectors_with_tfidf(clean_sentences: List[str], mode: Optional[str] = None):
+    """
+    Return L2-normalized TF-IDF vectors as a sparse CSR matrix. mode "corpus" transforms with the
+    corpus vectorizer when one is available; "document" (or no corpus vectorizer) fits on these sentences.
+    """
+    from sklearn.preprocessing import normalize
+
     if not clean_sentences:
         return np.zeros((0, 1))
-    tfidf = TfidfVectorizer(stop_words="english", max_df=0.85)
-    mat = tfidf.fit_transform(clean_sentences)
-    return mat.toarray()
+    tfidf = _get_corpus_tfidf() if (mode or TFIDF_MODE) == "corpus" else None
+    if tfidf is not None and _vocab_coverage(tfidf, clean_sentences) < TFIDF_MIN_COVERAGE:
+        tfidf = None
+    if tfidf is not None:
+        mat = tfidf.transform(clean_sentences)
+    else:
+        tfidf = _new_tfidf_vectorizer()
+        mat = tfidf.fit_transform(clean_sentences)
+    # kept sparse: a dense sentences x vocab copy of a long document can run to hundreds of MB
+    return normalize(mat.tocsr(), norm="l2", copy=False)
+
+
+def _hashing_vectorizer() -> "HashingVectorizer":
+    global _hashing
+    if _hashing is None:
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        # raw counts (norm=None, no sign flipping) so an IDF table can be applied before normalizing
+        _hashing = HashingVectorizer(n_features=2 ** HASHING_BITS, stop_words="english",
+                                     alternate_sign=False, norm=None)
+    return _hashing
+
+
+def fit_hashing_idf(texts: List[str], save: bool = True) -> np.ndarray:
+    """
+    Offline step for the hashing backend: document frequencies of the hashed sentence features
+    of texts, turned into smoothed IDF weights (same formula as TfidfVectorizer), and saved to
+    HASHING_IDF_PATH. Its size is fixed by HASHING_BITS, not by the corpus.
+    """
+    global _hashing_idf, _hashing_idf_tried
+    interner = _get_interner()
+    sent_tokens = [toks for t in texts for toks in _prepare_sentences(t, interner)[1] if len(toks)]
+    sents = _token_texts(sent_tokens, interner)
+    counts = _hashing_vectorizer().transform(sents)
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = (np.log((1.0 + len(sents)) / (1.0 + df)) + 1.0).astype("float32")
+    _hashing_idf, _hashing_idf_tried = idf, True
+    if save and HASHING_IDF_PATH:
+        try:
+            tmp = HASHING_IDF_PATH + ".tmp%d.npy" % os.getpid()
+            np.save(tmp, idf)
+            os.replace(tmp, HASHING_IDF_PATH)
+            _LOG.info("Saved hashing IDF table (%d sentences) to %s", len(sents), HASHING_IDF_PATH)
+        except OSError as e:
+            _LOG.warning("Could not save hashing IDF table to %s: %s", HASHING_IDF_PATH, e)
+    return idf
+
+
+def _get_hashing_idf() -> Optional[np.ndarray]:
+    global _hashing_idf, _hashing_idf_tried
+    if _hashing_idf is None and not _hashing_idf_tried:
+        _hashing_idf_tried = True
+        if HASHING_IDF_PATH and os.path.exists(HASHING_IDF_PATH):
+            try:
+                idf = np.load(HASHING_IDF_PATH, mmap_mode="r")
+                if idf.shape == (2 ** HASHING_BITS,):
+                    _hashing_idf = idf
+                else:
+                    _LOG.warning("Hashing IDF table %s does not match HASHING_BITS=%d; ignoring it.",
+                                 HASHING_IDF_PATH, HASHING_BITS)
+            except (OSError, ValueError) as e:
+                _LOG.warning("Could not load hashing IDF table %s: %s", HASHING_IDF_PATH, e)
+    return _hashing_idf
+
+
+def _sentence_vectors_with_hashing(clean_sentences: List[str]):
+    """
+    Return L2-normalized hashed term vectors (sparse CSR, 2**HASHING_BITS columns), IDF-weighted
+    when a precomputed table exists. No fitting: the same sentence always gives the same vector,
+    so vectors can be cached and compared across documents.
+    """
+    from sklearn.preprocessing import normalize
+
+    if not clean_sentences:
+        return np.zeros((0, 1))
+    mat = _hashing_vectorizer().transform(clean_sentences).astype("float32")
+    idf = _get_hashing_idf()
+    if idf is not None:
+        mat.data *= idf[mat.indices]
+    return normalize(mat, norm="l2", copy=False)
+
+
+def _lexical_sentence_vectors(sent_tokens: List[np.ndarray], interner: TokenInterner):
+    """Sparse lexical sentence vectors of normalized sentences from the configured LEXICAL_BACKEND."""
+    if LEXICAL_BACKEND == "hashing":
+        return _sentence_vectors_with_hashing(_token_texts(sent_tokens, interner))
+    return _sentence_vectors_with_tfidf(_token_texts(sent_tokens, interner))
+
+
+def _sparse_cosine_similarity(vecs: sp.csr_matrix) -> sp.csr_matrix:
+    """Cosine similarity of L2-normalized sparse rows as a sparse product, with a zero diagonal."""
+    sim = (vecs @ vecs.T).tocsr()
+    sim = sim - sp.diags(sim.diagonal())
+    sim.eliminate_zeros()
+    return sim
 
 
 # --- Core summarization functions ---
 
 
-def summary_text(test_text: str, n: int = 5) -> str:
+def _prepare_sentences(text: str, interner: TokenInterner):
+    """Split text into sentences; return (sentences, normalized token id array per sentence)."""
+    sentences = _sent_tokenize(str(text).strip()) if text else []
+    return sentences, _normalize_sentences(sentences, interner)
+
+
+def summary_text(test_text: str, n: int = 5, max_chars: Optional[int] = None,
+                 max_tokens: Optional[int] = None, selection: Optional[str] = None) -> str:
     """
     Summarize arbitrary text and return a string containing the top-n sentences (preserving order).
+    With max_chars and/or max_tokens, n is ignored and the summary is the highest-scoring set of
+    sentences whose joined length fits the budget ("" if no single sentence fits, or a budget is <= 0).
+    selection="mmr" picks the n sentences by Maximal Marginal Relevance over the similarity graph
+    instead of by score alone (default: SELECTION_MODE).
     Returns empty string for empty input.
     """
     if not test_text:
@@ -170,67 +662,214 @@ def summary_text(test_text: str, n: int = 5) -> str:
     if not text:
         return ""
 
-    # 1) tokenize into sentences
-    sentences = _sent_tokenize(text)
+    # 1) tokenize into sentences, 2) normalize them once into tokens for every vector backend
+    interner = _get_interner()
+    sentences, sent_tokens = _prepare_sentences(text, interner)
     if not sentences:
         return ""
 
-    # 2) clean sentences for vector creation
-    cleaned = [_clean_sentence_for_vectors(s) for s in sentences]
-    no_stop = [_remove_stopwords_from_tokens(s.split()) for s in cleaned]
-
-    # 3) try glove
-    glove = _load_glove()
+    # 3) try glove (skipped while a background warm-up is still loading it)
+    glove = _glove_if_ready()
     if glove:
-        sent_vecs = _sentence_vectors_with_glove(no_stop, glove, _glove_dim)
+        sent_vecs = _sentence_vectors_with_glove(sent_tokens, glove, _glove_dim, interner)
     else:
         sent_vecs = None
 
-    # 4) if no glove or glove failed, use TF-IDF
+    # 4) if no glove or glove failed, use lexical vectors (TF-IDF or hashing)
     if sent_vecs is None or sent_vecs.shape[0] == 0:
-        sent_vecs = _sentence_vectors_with_tfidf(no_stop)
+        sent_vecs = _lexical_sentence_vectors(sent_tokens, interner)
 
     # 5) build similarity matrix
     m = len(sentences)
     if m == 0:
         return ""
+    sim_mat = None
+    if _degree_ranking_only(sent_vecs.shape[0]):
+        # too large for the full graph and no top-k / threshold: similarity degree scores
+        scores = degree_scores(sent_vecs)
+    else:
+        sim_mat = _similarity_graph(sent_vecs)
+
+        # 6) PageRank / scoring
+        scores = _graph_scores(sim_mat)
+
+    # 7) rank sentences and choose top-n (or the best set under the length budget)
+    return _select_summary(sentences, scores, n, max_chars, max_tokens, selection, sim_mat)
+
+
+def _graph_scores(sim_mat) -> np.ndarray:
+    """PageRank of one similarity graph; weighted degree when it does not converge."""
     try:
-        sim = cosine_similarity(sent_vecs)
-        sim = np.nan_to_num(sim, nan=0.0)
-        np.fill_diagonal(sim, 0.0)
-        sim_mat = sim
-    except Exception:
-        sim_mat = np.zeros((m, m), dtype="float32")
-        for i in range(m):
-            for j in range(m):
-                if i == j:
-                    continue
-                a = sent_vecs[i].reshape(1, -1)
-                b = sent_vecs[j].reshape(1, -1)
-                denom = (np.linalg.norm(a) * np.linalg.norm(b) + 1e-9)
-                sim_mat[i, j] = float(np.dot(a, b.T) / denom)
-
-    # 6) PageRank / scoring
-    try:
-        nx_graph = nx.from_numpy_array(sim_mat)
-        scores = nx.pagerank(nx_graph)
+        return pagerank(sim_mat, damping=PAGERANK_DAMPING, tol=PAGERANK_TOL, max_iter=PAGERANK_MAX_ITER)
     except Exception:
-        scores = {i: float(sim_mat[i].sum()) for i in range(m)}
+        return np.asarray(sim_mat.sum(axis=1)).ravel()
+
+
+def _graph_edges(sim_mat) -> int:
+    """Stored entries of a similarity graph (every entry of a dense one)."""
+    return sim_mat.nnz if sp.issparse(sim_mat) else sim_mat.size
+
+
+def _over_memory_budget(m: int) -> bool:
+    """True when a full float64 m x m similarity matrix would not fit in SIMILARITY_MEMORY_MB."""
+    return m * m * 8 > SIMILARITY_MEMORY_MB * 2**20
+
+
+def _degree_ranking_only(m: int) -> bool:
+    return _over_memory_budget(m) and not (GRAPH_TOP_K or GRAPH_THRESHOLD is not None)
+
+
+def _similarity_graph(sent_vecs):
+    """Sentence similarity graph with a zero diagonal: sparse for TF-IDF vectors, dense for GloVe;
+    sparsified into a top-k / thresholded graph when GRAPH_TOP_K / GRAPH_THRESHOLD are set
+    (built block by block when the full matrix would exceed SIMILARITY_MEMORY_MB)."""
+    if _over_memory_budget(sent_vecs.shape[0]):
+        return blocked_similarity_graph(sent_vecs, top_k=GRAPH_TOP_K, threshold=GRAPH_THRESHOLD,
+                                        max_bytes=int(SIMILARITY_MEMORY_MB * 2**20))
+    if sp.issparse(sent_vecs):
+        sim_mat = _sparse_cosine_similarity(sent_vecs)
+    else:
+        try:
+            from sklearn.metrics.pairwise import cosine_similarity
+
+            sim = cosine_similarity(sent_vecs)
+            sim = np.nan_to_num(sim, nan=0.0)
+            np.fill_diagonal(sim, 0.0)
+            sim_mat = sim
+        except Exception:
+            sim_mat = safe_cosine_similarity(sent_vecs)
+
+    if GRAPH_TOP_K or GRAPH_THRESHOLD is not None:
+        sim_mat = sparsify_similarity(sim_mat, top_k=GRAPH_TOP_K, threshold=GRAPH_THRESHOLD)
+    return sim_mat
+
 
-    # 7) rank sentences and choose top-n
-    ranked = sorted(((scores.get(i, 0.0), i, sentences[i]) for i in range(m)), key=lambda x: x[0], reverse=True)
-    topk = ranked[: max(1, int(n))]
-    top_indices = sorted([t[1] for t in topk])
+def _top_n_summary(sentences: List[str], scores: np.ndarray, n: int) -> str:
+    """The top-n scored sentences (at least one) joined in their original order."""
+    top_indices = top_n_indices(scores, max(1, int(n)))
     summary_parts = [sentences[i].strip() for i in top_indices]
     return " ".join(summary_parts)
 
 
-def summarize_dataset(excel_path: str = "TASK.xlsx", text_col: Optional[str] = None, n: int = 5, save_csv: bool = True) -> List[Dict]:
+def _budget_summary(sentences: List[str], scores: np.ndarray, max_chars: Optional[int],
+                    max_tokens: Optional[int]) -> str:
+    """Best-scoring sentences (original order) whose joined text fits max_chars characters and/or
+    max_tokens whitespace tokens. Each cost is taken as a fraction of its budget; with both
+    budgets a sentence costs the larger fraction, which keeps the total within each. A budget
+    <= 0 fits nothing and gives ""."""
+    if (max_chars is not None and max_chars <= 0) or (max_tokens is not None and max_tokens <= 0):
+        return ""
+    parts = [s.strip() for s in sentences]
+    cost = np.zeros(len(parts))
+    if max_chars is not None:
+        # every sentence after the first also costs its joining space
+        cost = np.maximum(cost, np.array([len(p) + 1 for p in parts]) / (max_chars + 1))
+    if max_tokens is not None:
+        cost = np.maximum(cost, np.array([len(p.split()) for p in parts]) / max_tokens)
+    return " ".join(parts[i] for i in budget_indices(scores, cost, 1.0))
+
+
+def _mmr_summary(sentences: List[str], scores: np.ndarray, sim_mat, n: int) -> str:
+    """n sentences (at least one) by Maximal Marginal Relevance, joined in their original order."""
+    indices = mmr_indices(scores, sim_mat, max(1, int(n)), lam=MMR_LAMBDA)
+    return " ".join(sentences[i].strip() for i in indices)
+
+
+def _select_summary(sentences: List[str], scores: np.ndarray, n: int, max_chars: Optional[int] = None,
+                    max_tokens: Optional[int] = None, selection: Optional[str] = None, sim_mat=None) -> str:
+    """Pick the summary sentences: length budget if given, else MMR or top-n. MMR needs the
+    similarity graph; without one (degree-ranked long documents) it falls back to top-n."""
+    if max_chars is not None or max_tokens is not None:
+        return _budget_summary(sentences, scores, max_chars, max_tokens)
+    if (selection or SELECTION_MODE) == "mmr" and sim_mat is not None:
+        return _mmr_summary(sentences, scores, sim_mat, n)
+    return _top_n_summary(sentences, scores, n)
+
+
+def summarize_texts(texts: List[str], n: int = 5, batch_size: int = 1024, max_chars: Optional[int] = None,
+                    max_tokens: Optional[int] = None, selection: Optional[str] = None) -> List[str]:
     """
-    Read dataset from excel_path (.xlsx/.xls/.csv). Try to find the text column (text_col param).
-    Produce a list of dicts: [{'TEST DATASET': idx, 'Introduction': original_text, 'Summary': summary}, ...]
-    Optionally writes SummaryFile.csv next to dataset file.
+    Summaries for many texts; same output as calling summary_text on each. Per batch of
+    batch_size texts, GloVe sentence vectors are built in a few calls (BATCH_SENTENCES sentences
+    each) and the small similarity graphs are ranked by block-diagonal PageRank solves of at
+    most BATCH_EDGES entries; larger graphs are ranked one by one, so memory stays bounded by
+    the largest single document rather than the batch. A text that fails gives "".
+    max_chars / max_tokens / selection choose the sentences as in summary_text.
     """
+    out = [""] * len(texts)
+    pending = []  # (row, sentences, graph) waiting for one pagerank_batch solve
+    pending_edges = 0
+
+    def flush():
+        nonlocal pending, pending_edges
+        all_scores, converged = pagerank_batch([g[2] for g in pending], damping=PAGERANK_DAMPING,
+                                               tol=PAGERANK_TOL, max_iter=PAGERANK_MAX_ITER)
+        for (i, sentences, sim_mat), scores, ok in zip(pending, all_scores, converged):
+            if not ok:
+                scores = np.asarray(sim_mat.sum(axis=1)).ravel()
+            out[i] = _select_summary(sentences, scores, n, max_chars, max_tokens, selection, sim_mat)
+        pending, pending_edges = [], 0
+
+    for start in range(0, len(texts), batch_size):
+        interner = _get_interner()
+        prepared = []
+        for i in range(start, min(start + batch_size, len(texts))):
+            try:
+                sentences, sent_tokens = _prepare_sentences(texts[i], interner) if texts[i] else ([], [])
+            except Exception as e:
+                _LOG.exception("Failed summarizing row %s: %s", i + 1, e)
+                continue
+            if sentences:
+                prepared.append((i, sentences, sent_tokens))
+
+        glove = _glove_if_ready()
+        for group in _sentence_groups(prepared, BATCH_SENTENCES):
+            if glove:
+                glove_vecs = _sentence_vectors_with_glove_batch([p[2] for p in group], glove, _glove_dim,
+                                                               interner)
+            else:
+                glove_vecs = [None] * len(group)
+            for (i, sentences, sent_tokens), vecs in zip(group, glove_vecs):
+                try:
+                    if vecs is None or vecs.shape[0] == 0:
+                        vecs = _lexical_sentence_vectors(sent_tokens, interner)
+                    if _degree_ranking_only(vecs.shape[0]):
+                        out[i] = _select_summary(sentences, degree_scores(vecs), n, max_chars, max_tokens, selection)
+                        continue
+                    sim_mat = _similarity_graph(vecs)
+                    edges = _graph_edges(sim_mat)
+                    if edges > BATCH_GRAPH_MAX_EDGES:
+                        out[i] = _select_summary(sentences, _graph_scores(sim_mat), n, max_chars, max_tokens,
+                                                 selection, sim_mat)
+                        continue
+                    if pending and pending_edges + edges > BATCH_EDGES:
+                        flush()
+                    pending.append((i, sentences, sim_mat))
+                    pending_edges += edges
+                except Exception as e:
+                    _LOG.exception("Failed summarizing row %s: %s", i + 1, e)
+    flush()
+    return out
+
+
+def _sentence_groups(prepared: List, max_sentences: int) -> List[List]:
+    """Consecutive runs of prepared documents holding at most max_sentences sentences (or one document)."""
+    groups, group, count = [], [], 0
+    for doc in prepared:
+        if group and count + len(doc[1]) > max_sentences:
+            groups.append(group)
+            group, count = [], 0
+        group.append(doc)
+        count += len(doc[1])
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _read_dataset_texts(excel_path: str, text_col: Optional[str] = None) -> List[str]:
+    """Read dataset (.xlsx/.xls/.csv), pick the text column and return its values as strings ("" for NaN)."""
+    import pandas as pd
+
     if not os.path.exists(excel_path):
         raise FileNotFoundError(f"{excel_path} not found.")
 
@@ -259,20 +898,40 @@ def summarize_dataset(excel_path: str = "TASK.xlsx", text_col: Optional[str] = N
             else:
                 col_found = df.columns[0]
 
-    results = []
-    for i, val in enumerate(df[col_found].tolist(), start=1):
+    texts = []
+    for val in df[col_found].tolist():
         if pd.isna(val) or (isinstance(val, float) and np.isnan(val)):
-            text = ""
+            texts.append("")
         else:
-            text = str(val)
+            texts.append(str(val))
+    return texts
+
+
+def summarize_dataset(excel_path: str = "TASK.xlsx", text_col: Optional[str] = None, n: int = 5, save_csv: bool = True,
+                      refit_tfidf: bool = False, max_chars: Optional[int] = None,
+                      max_tokens: Optional[int] = None) -> List[Dict]:
+    """
+    Read dataset from excel_path (.xlsx/.xls/.csv). Try to find the text column (text_col param).
+    Produce a list of dicts: [{'TEST DATASET': idx, 'Introduction': original_text, 'Summary': summary}, ...]
+    Optionally writes SummaryFile.csv next to dataset file.
+    With refit_tfidf=True (TF-IDF "corpus" mode) the dataset is used to fit and persist the corpus
+    vectorizer first; it is never fit implicitly, since later requests would all be transformed
+    with it. max_chars / max_tokens bound each summary's length as in summary_text.
+    """
+    texts = _read_dataset_texts(excel_path, text_col)
+    if TFIDF_MODE == "corpus" and refit_tfidf:
         try:
-            summ = summary_text(text, n)
-        except Exception as e:
-            _LOG.exception("Failed summarizing row %s: %s", i, e)
-            summ = ""
-        results.append({"TEST DATASET": i, "Introduction": text, "Summary": summ})
+            fit_corpus_tfidf(texts)
+        except ValueError as e:
+            _LOG.warning("Could not fit corpus TF-IDF on %s: %s", excel_path, e)
+
+    summaries = summarize_texts(texts, n, max_chars=max_chars, max_tokens=max_tokens)
+    results = [{"TEST DATASET": i, "Introduction": text, "Summary": summ}
+               for i, (text, summ) in enumerate(zip(texts, summaries), start=1)]
 
     if save_csv:
+        import pandas as pd
+
         out_df = pd.DataFrame(results)
         out_path = os.path.join(os.path.dirname(excel_path) or ".", "SummaryFile.csv")
         out_df.to_csv(out_path, index=False)
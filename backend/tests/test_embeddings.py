@@ -0,0 +1,94 @@
+"""
+backend/tests/test_embeddings.py
+
+Round-trips of the embedding source formats through load_glove_matrix. Run from backend/:
+    python -m unittest discover tests      (or: python -m pytest tests)
+"""
+
+import bz2
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+
+import embeddings
+
+WORDS = ["the", "cat", "sat", "on", "mat", "café"]
+
+
+class SourceFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self._cache_dir = embeddings.CACHE_DIR
+        embeddings.CACHE_DIR = os.path.join(self.dir, "cache")
+        rng = np.random.default_rng(0)
+        # values with an exact short decimal form, so the text formats round-trip exactly
+        self.matrix = (rng.integers(-999, 999, (len(WORDS), 4)) / 100.0).astype("float32")
+
+    def tearDown(self):
+        embeddings.CACHE_DIR = self._cache_dir
+        shutil.rmtree(self.dir)
+
+    def _text(self, header=False, words=WORDS, matrix=None) -> bytes:
+        matrix = self.matrix if matrix is None else matrix
+        lines = ["%d %d" % matrix.shape] if header else []
+        lines += [w + " " + " ".join("%.2f" % v for v in row) for w, row in zip(words, matrix)]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _word2vec_bin(self) -> bytes:
+        out = [("%d %d\n" % self.matrix.shape).encode()]
+        for w, row in zip(WORDS, self.matrix):
+            out.append(w.encode("utf-8") + b" " + row.astype("<f4").tobytes() + b"\n")
+        return b"".join(out)
+
+    def _write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+    def _check(self, path, member=None, fmt="text", words=WORDS, expected=None):
+        expected = self.matrix if expected is None else expected
+        self.assertEqual(embeddings.detect_format(path, member), fmt)
+        for _ in range(2):  # parse, then the binary cache
+            vocab, matrix = embeddings.load_glove_matrix(path, member=member)
+            self.assertEqual(list(vocab), words)
+            np.testing.assert_array_equal(np.asarray(matrix), expected)
+
+    def test_plain_and_compressed_text(self):
+        text = self._text()
+        self._check(self._write("vec.txt", text))
+        self._check(self._write("vec.txt.gz", gzip.compress(text)))
+        self._check(self._write("vec.txt.bz2", bz2.compress(text)))
+
+    def test_word2vec_text_header(self):
+        self._check(self._write("vec.vec", self._text(header=True)))
+
+    def test_zip_member(self):
+        path = os.path.join(self.dir, "vecs.zip")
+        other_words = ["fish", "bird"]
+        other = np.array([[1.5, -2.25, 0.5], [0.0, 3.0, -1.0]], dtype="float32")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("a/vec.txt", self._text())
+            zf.writestr("b/vec.bin", self._word2vec_bin())
+            zf.writestr("c/vec.txt", self._text(words=other_words, matrix=other))
+        self._check(path, member="a/vec.txt")
+        self._check(path, member="b/vec.bin", fmt="word2vec-bin")
+        # same basename as a/vec.txt: must not be served from a/vec.txt's cache
+        self._check(path, member="c/vec.txt", words=other_words, expected=other)
+        self._check(path, member="a/vec.txt")
+        with self.assertRaises(ValueError):
+            embeddings.load_glove_matrix(path)  # two vector files and no member
+
+    def test_word2vec_binary(self):
+        data = self._word2vec_bin()
+        self._check(self._write("vec.bin", data), fmt="word2vec-bin")
+        self._check(self._write("vec.bin.gz", gzip.compress(data)), fmt="word2vec-bin")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+backend/tests/test_ranking.py
+
+Checks of ranking.py against reference implementations. Run from backend/:
+    python -m unittest discover tests      (or: python -m pytest tests)
+"""
+
+import itertools
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from ranking import (blocked_similarity_graph, budget_indices, mmr_indices, pagerank, pagerank_batch,
+                     safe_cosine_similarity, sparsify_similarity, top_n_indices)
+from summarizer import _budget_summary
+
+try:
+    import networkx as nx
+except ImportError:  # networkx is a benchmark-only dependency
+    nx = None
+
+
+def _random_graph(rng, m, density=0.3, dangling=0):
+    w = rng.random((m, m)) * (rng.random((m, m)) < density)
+    np.fill_diagonal(w, 0.0)
+    w[:dangling] = 0.0  # rows with no out-edges
+    return w
+
+
+def _full_similarity(vecs):
+    """Whole m x m cosine similarity with a zero diagonal (sparse for sparse vecs, as summarizer.py builds it)."""
+    if not sp.issparse(vecs):
+        return safe_cosine_similarity(vecs)
+    norms = np.sqrt(np.asarray(vecs.multiply(vecs).sum(axis=1)).ravel())
+    unit = sp.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ vecs
+    sim = (unit @ unit.T).tocsr()
+    sim = sim - sp.diags(sim.diagonal())
+    sim.eliminate_zeros()
+    return sim
+
+
+class PageRankTest(unittest.TestCase):
+    @unittest.skipIf(nx is None, "networkx not installed")
+    def test_matches_networkx(self):
+        rng = np.random.default_rng(0)
+        for m, dangling in ((1, 0), (5, 0), (30, 0), (30, 4), (12, 12)):
+            w = _random_graph(rng, m, dangling=dangling)
+            ranks = nx.pagerank(nx.from_numpy_array(w, create_using=nx.DiGraph))
+            expected = np.array([ranks[i] for i in range(m)])
+            for weights in (w, sp.csr_matrix(w)):
+                np.testing.assert_allclose(pagerank(weights), expected, atol=1e-6)
+
+    def test_batch_equals_single(self):
+        rng = np.random.default_rng(1)
+        graphs = [_random_graph(rng, m, dangling=d) for m, d in ((0, 0), (1, 0), (7, 2), (40, 0), (3, 3))]
+        graphs += [sp.csr_matrix(_random_graph(rng, 25))]
+        scores, converged = pagerank_batch(graphs)
+        self.assertTrue(converged.all())
+        for w, got in zip(graphs, scores):
+            np.testing.assert_allclose(got, pagerank(w), rtol=1e-12, atol=1e-15)
+
+
+class SimilarityGraphTest(unittest.TestCase):
+    def _vectors(self):
+        rng = np.random.default_rng(2)
+        dense = rng.standard_normal((120, 16)).astype("float32")
+        dense[5] = 0.0  # all-zero sentence
+        counts = sp.random(120, 300, density=0.05, format="csr", random_state=3)
+        return dense, counts
+
+    def test_blocked_equals_full(self):
+        for vecs in self._vectors():
+            full = _full_similarity(vecs)
+            for top_k, threshold in ((5, None), (None, 0.2), (3, 0.1)):
+                expected = sparsify_similarity(full, top_k=top_k, threshold=threshold)
+                # a small max_bytes forces many row blocks
+                got = blocked_similarity_graph(vecs, top_k=top_k, threshold=threshold, max_bytes=20000)
+                self.assertEqual(got.nnz, expected.nnz)
+                np.testing.assert_allclose(got.toarray(), expected.toarray(), atol=1e-5)
+
+    def test_blocked_needs_a_rule(self):
+        with self.assertRaises(ValueError):
+            blocked_similarity_graph(np.eye(3))
+
+
+class TopNTest(unittest.TestCase):
+    def test_ties_go_to_earlier_positions(self):
+        scores = np.array([0.1, 0.5, 0.3, 0.5, 0.3, 0.3, 0.9])
+        self.assertEqual(top_n_indices(scores, 3).tolist(), [1, 3, 6])
+        self.assertEqual(top_n_indices(scores, 4).tolist(), [1, 2, 3, 6])
+        self.assertEqual(top_n_indices(scores, 5).tolist(), [1, 2, 3, 4, 6])
+
+    def test_matches_stable_sort(self):
+        rng = np.random.default_rng(4)
+        scores = rng.integers(0, 5, 200).astype(float)
+        for n in (0, 1, 7, 50, 200, 300):
+            expected = np.sort(np.argsort(-scores, kind="stable")[:n])
+            np.testing.assert_array_equal(top_n_indices(scores, n), expected)
+
+    def test_nan_ranks_last(self):
+        self.assertEqual(top_n_indices([np.nan, 0.2, 0.1], 2).tolist(), [1, 2])
+
+
+class MMRTest(unittest.TestCase):
+    def _graph(self, seed, m=40):
+        rng = np.random.default_rng(seed)
+        sim = sparsify_similarity(safe_cosine_similarity(rng.standard_normal((m, 8))), top_k=5)
+        return rng.random(m), sim
+
+    def test_lam_one_is_top_n(self):
+        for seed in range(5):
+            scores, sim = self._graph(seed)
+            for n in (0, 1, 5, 40, 50):
+                np.testing.assert_array_equal(mmr_indices(scores, sim, n, lam=1.0), top_n_indices(scores, n))
+
+    def test_avoids_near_duplicates(self):
+        # sentences 0 and 1 are near-duplicates and both outrank 2
+        scores = np.array([1.0, 0.95, 0.6])
+        sim = np.array([[0.0, 0.98, 0.1], [0.98, 0.0, 0.1], [0.1, 0.1, 0.0]])
+        self.assertEqual(top_n_indices(scores, 2).tolist(), [0, 1])
+        self.assertEqual(mmr_indices(scores, sim, 2, lam=0.7).tolist(), [0, 2])
+
+    def test_sparse_equals_dense(self):
+        for seed in range(5):
+            scores, sim = self._graph(seed)
+            for lam in (0.3, 0.7, 1.0):
+                np.testing.assert_array_equal(mmr_indices(scores, sim, 10, lam=lam),
+                                              mmr_indices(scores, sim.toarray(), 10, lam=lam))
+
+
+class BudgetTest(unittest.TestCase):
+    def test_within_half_of_brute_force(self):
+        rng = np.random.default_rng(5)
+        for _ in range(200):
+            m = int(rng.integers(1, 9))
+            scores = rng.random(m)
+            costs = rng.random(m)
+            budget = float(rng.random() * costs.sum())
+            got = budget_indices(scores, costs, budget)
+            self.assertTrue(np.all(np.diff(got) > 0))
+            self.assertLessEqual(costs[got].sum(), budget + 1e-12)
+            best = max(scores[list(sub)].sum() for k in range(m + 1) for sub in itertools.combinations(range(m), k)
+                       if costs[list(sub)].sum() <= budget)
+            self.assertGreaterEqual(scores[got].sum(), best / 2 - 1e-12)
+
+    def test_best_single_beats_greedy(self):
+        # by ratio greedy takes sentence 0 and then nothing else fits; sentence 1 alone scores more
+        self.assertEqual(budget_indices([1.0, 9.0], [0.1, 1.0], 1.0).tolist(), [1])
+
+    def test_nothing_fits(self):
+        self.assertEqual(len(budget_indices([1.0, 2.0], [3.0, 4.0], 2.0)), 0)
+        self.assertEqual(len(budget_indices([1.0, 2.0], [0.0, 1.0], 0.0)), 0)
+
+
+class BudgetSummaryTest(unittest.TestCase):
+    def _sentences(self, rng, m):
+        words = ["a", "bb", "ccc", "dddd", "eeeeeeeee"]
+        return [" ".join(rng.choice(words, int(rng.integers(1, 8))).tolist()) + "." for _ in range(m)]
+
+    def test_joined_text_fits_budgets(self):
+        rng = np.random.default_rng(6)
+        for _ in range(300):
+            sents = self._sentences(rng, int(rng.integers(1, 12)))
+            scores = rng.random(len(sents))
+            max_chars = int(rng.integers(1, 120)) if rng.random() < 0.8 else None
+            max_tokens = int(rng.integers(1, 20)) if max_chars is None or rng.random() < 0.5 else None
+            out = _budget_summary(sents, scores, max_chars, max_tokens)
+            if max_chars is not None:
+                self.assertLessEqual(len(out), max_chars)
+            if max_tokens is not None:
+                self.assertLessEqual(len(out.split()), max_tokens)
+
+    def test_exact_fit_counts_joining_spaces(self):
+        sents = ["Aaaa.", "Bbbb.", "Cccc."]  # 5 chars each, joined: 5 + 1 + 5 + 1 + 5
+        scores = np.ones(3)
+        self.assertEqual(_budget_summary(sents, scores, 17, None), "Aaaa. Bbbb. Cccc.")
+        self.assertEqual(len(_budget_summary(sents, scores, 16, None)), 11)
+        self.assertEqual(_budget_summary(sents, scores, 17, 2), "Aaaa. Bbbb.")
+
+    def test_non_positive_budgets_give_empty(self):
+        sents, scores = ["One two.", "Three."], np.array([0.5, 0.7])
+        for max_chars, max_tokens in ((0, None), (-5, None), (None, 0), (None, -1), (100, 0), (0, 100)):
+            self.assertEqual(_budget_summary(sents, scores, max_chars, max_tokens), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+backend/tests/test_segmenter.py
+
+Sentence boundary cases of segmenter.py. Run from backend/:
+    python -m unittest discover tests      (or: python -m pytest tests)
+"""
+
+import unittest
+
+from segmenter import sentence_spans, split_sentences
+
+CASES = [
+    # (text, expected sentences)
+    ("Cats sleep. Dogs bark! Do birds sing? Yes.", ["Cats sleep.", "Dogs bark!", "Do birds sing?", "Yes."]),
+    ("Dr. Smith arrived at 3.5 p.m. He left.", ["Dr. Smith arrived at 3.5 p.m.", "He left."]),
+    ("Take 2 tabs. daily, e.g. after meals. Then rest.", ["Take 2 tabs. daily, e.g. after meals.", "Then rest."]),
+    ("Approx. two hours. Done.", ["Approx. two hours.", "Done."]),
+    ("He works at Acme Inc. The firm is big.", ["He works at Acme Inc.", "The firm is big."]),
+    ("Wait... What happened?! Nothing... at all.", ["Wait...", "What happened?!", "Nothing... at all."]),
+    ('She said "Stop." Then she left.', ['She said "Stop."', "Then she left."]),
+    ("First part\n\nSecond part", ["First part", "Second part"]),
+    # initials
+    ("J. R. R. Tolkien wrote it. He died.", ["J. R. R. Tolkien wrote it.", "He died."]),
+    ("I met J. Smith today.", ["I met J. Smith today."]),
+    ("I. M. Pei designed it.", ["I. M. Pei designed it."]),
+    ("Ask Mr. T.", ["Ask Mr. T."]),
+    # a capital letter before an ordinary sentence opener ends the sentence
+    ("We waited, but not before I. Then we ate.", ["We waited, but not before I.", "Then we ate."]),
+    ("Vitamin A. It helps.", ["Vitamin A.", "It helps."]),
+    ("Plan B. The rest failed.", ["Plan B.", "The rest failed."]),
+]
+
+
+class SegmenterTest(unittest.TestCase):
+    def test_cases(self):
+        for text, expected in CASES:
+            with self.subTest(text=text):
+                self.assertEqual(split_sentences(text), expected)
+
+    def test_spans_are_offsets(self):
+        text = "  One here.  Two there!\n\nThree  "
+        spans = sentence_spans(text)
+        self.assertEqual([text[a:b] for a, b in spans], ["One here.", "Two there!", "Three"])
+
+    def test_empty(self):
+        self.assertEqual(split_sentences(""), [])
+        self.assertEqual(split_sentences(" \n\n "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()